@@ -53,6 +53,10 @@ class InMemoryCache(CacheBackend):
     def set(self, key: str, value: dict, ttl_seconds: int) -> None:
         self._store[key] = value
 
+    def clear(self) -> None:
+        self._store.clear()
+        self._stats = CacheStats()
+
     @property
     def hit_rate(self) -> float:
         return self._stats.hit_rate
@@ -1,5 +1,9 @@
 import ipaddress
 
+# Keep the /24 network for IPv4 and the /64 network for IPv6.
+_IPV4_NETWORK_MASK = 0xFFFFFF00
+_IPV6_NETWORK_MASK = ((1 << 64) - 1) << 64
+
 
 def anonymize_ip(ip: str | None) -> str | None:
     if not ip:
@@ -13,12 +17,5 @@ def anonymize_ip(ip: str | None) -> str | None:
         return None
 
     if isinstance(parsed, ipaddress.IPv4Address):
-        octets = value.split(".")
-        if len(octets) != 4:
-            return None
-        octets[-1] = "0"
-        return ".".join(octets)
-
-    hextets = parsed.exploded.split(":")
-    masked = hextets[:4] + ["0000", "0000", "0000", "0000"]
-    return ":".join(masked)
+        return str(ipaddress.IPv4Address(int(parsed) & _IPV4_NETWORK_MASK))
+    return ipaddress.IPv6Address(int(parsed) & _IPV6_NETWORK_MASK).exploded
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.orm import Session
 
 from pathmind_api import models, schemas
@@ -272,15 +272,20 @@ def list_mapped_uniprot_targets(session: Session, max_items: int = 20000) -> lis
     return sorted({row for row in rows if row})
 
 
-def purge_old_api_logs(session: Session, retention_days: int = 90) -> int:
+def purge_old_api_logs(session: Session, retention_days: int = 90, batch_size: int = 1000) -> int:
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
     cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
-    query = select(models.ApiEventLog).where(models.ApiEventLog.timestamp < cutoff)
-    rows = session.execute(query).scalars().all()
-    deleted = len(rows)
-    for row in rows:
-        session.delete(row)
-    session.commit()
-    return deleted
+    # Delete in bounded batches on the indexed timestamp so each transaction stays short.
+    expired_ids = select(models.ApiEventLog.id).where(models.ApiEventLog.timestamp < cutoff).limit(batch_size)
+    statement = delete(models.ApiEventLog).where(models.ApiEventLog.id.in_(expired_ids.scalar_subquery()))
+    deleted = 0
+    while True:
+        removed = session.execute(statement, execution_options={"synchronize_session": False}).rowcount
+        session.commit()
+        deleted += removed
+        if removed < batch_size:
+            return deleted
 
 
 def create_job_run(
@@ -566,6 +571,37 @@ def upsert_gene_identifier_map(
     session.commit()
 
 
+def upsert_gene_identifier_maps(session: Session, rows: list[dict]) -> int:
+    by_symbol: dict[str, dict] = {}
+    for row in rows:
+        key = str(row.get("gene_symbol", "")).strip().upper()
+        if key:
+            by_symbol[key] = row
+    if not by_symbol:
+        return 0
+    query = select(models.GeneIdentifierMap).where(models.GeneIdentifierMap.gene_symbol.in_(sorted(by_symbol)))
+    existing_by_symbol = {row.gene_symbol: row for row in session.execute(query).scalars()}
+    for key, row in by_symbol.items():
+        aliases = sorted(set(alias.strip().upper() for alias in (row.get("aliases") or []) if alias.strip()))
+        existing = existing_by_symbol.get(key)
+        if existing is None:
+            session.add(
+                models.GeneIdentifierMap(
+                    gene_symbol=key,
+                    ensembl_id=row.get("ensembl_id"),
+                    uniprot_id=row.get("uniprot_id"),
+                    aliases=aliases,
+                )
+            )
+        else:
+            existing.ensembl_id = row.get("ensembl_id")
+            existing.uniprot_id = row.get("uniprot_id")
+            existing.aliases = aliases
+            existing.updated_at = datetime.now(timezone.utc)
+    session.commit()
+    return len(by_symbol)
+
+
 def get_gene_identifier(session: Session, gene_symbol: str) -> models.GeneIdentifierMap | None:
     key = gene_symbol.strip().upper()
     if not key:
@@ -633,11 +669,21 @@ def get_tissue_expression_for_gene(session: Session, gene_symbol: str) -> list[m
     return session.execute(query).scalars().all()
 
 
+def get_latest_expression_update(session: Session, gene_symbol: str) -> datetime | None:
+    key = gene_symbol.strip().upper()
+    query = select(func.max(models.TissueExpression.updated_at)).where(models.TissueExpression.gene_symbol == key)
+    return session.execute(query).scalar_one_or_none()
+
+
 def get_tissue_expression_for_genes(session: Session, gene_symbols: list[str]) -> list[models.TissueExpression]:
     keys = sorted({symbol.strip().upper() for symbol in gene_symbols if symbol.strip()})
     if not keys:
         return []
-    query = select(models.TissueExpression).where(models.TissueExpression.gene_symbol.in_(keys))
+    query = (
+        select(models.TissueExpression)
+        .where(models.TissueExpression.gene_symbol.in_(keys))
+        .order_by(models.TissueExpression.gene_symbol.asc(), models.TissueExpression.tissue.asc())
+    )
     return session.execute(query).scalars().all()
 
 
@@ -804,6 +850,22 @@ def get_gene_identifier_by_uniprot(session: Session, uniprot_id: str) -> models.
     return session.execute(query).scalar_one_or_none()
 
 
+def get_gene_identifiers_by_uniprots(session: Session, uniprot_ids: list[str]) -> dict[str, models.GeneIdentifierMap]:
+    keys = sorted({item for item in uniprot_ids if item})
+    if not keys:
+        return {}
+    # A UniProt ID shared by several symbols maps to the alphabetically first symbol.
+    query = (
+        select(models.GeneIdentifierMap)
+        .where(models.GeneIdentifierMap.uniprot_id.in_(keys))
+        .order_by(models.GeneIdentifierMap.uniprot_id, models.GeneIdentifierMap.gene_symbol)
+    )
+    mapped: dict[str, models.GeneIdentifierMap] = {}
+    for row in session.execute(query).scalars():
+        mapped.setdefault(row.uniprot_id, row)
+    return mapped
+
+
 def create_patient_profile(
     session: Session,
     *,
@@ -864,30 +926,29 @@ def add_patient_pgx_gene_calls(session: Session, patient_id: str, rows: list[dic
 
 
 def add_patient_pgx_drug_recommendations(session: Session, patient_id: str, rows: list[dict]) -> int:
-    query = select(models.PatientPgxDrugRecommendation).where(models.PatientPgxDrugRecommendation.patient_id == patient_id)
-    existing = session.execute(query).scalars().all()
-    for row in existing:
-        session.delete(row)
-    inserted = 0
-    for row in rows:
-        session.add(
-            models.PatientPgxDrugRecommendation(
-                id=str(uuid4()),
-                patient_id=patient_id,
-                drug_id=row.get("drug_id"),
-                drug_name=str(row.get("drug_name", "")),
-                recommendation=str(row.get("recommendation", "insufficient_data")),
-                evidence_level=row.get("evidence_level"),
-                cpic_guideline_id=row.get("cpic_guideline_id"),
-                state=str(row.get("state", "unknown")),
-                reason_code=str(row.get("reason_code", "guideline_not_found")),
-                provenance=row.get("provenance", {}),
-                confidence_note=row.get("confidence_note"),
-            )
-        )
-        inserted += 1
+    session.execute(
+        delete(models.PatientPgxDrugRecommendation).where(models.PatientPgxDrugRecommendation.patient_id == patient_id)
+    )
+    values = [
+        {
+            "id": str(uuid4()),
+            "patient_id": patient_id,
+            "drug_id": row.get("drug_id"),
+            "drug_name": str(row.get("drug_name", "")),
+            "recommendation": str(row.get("recommendation", "insufficient_data")),
+            "evidence_level": row.get("evidence_level"),
+            "cpic_guideline_id": row.get("cpic_guideline_id"),
+            "state": str(row.get("state", "unknown")),
+            "reason_code": str(row.get("reason_code", "guideline_not_found")),
+            "provenance": row.get("provenance", {}),
+            "confidence_note": row.get("confidence_note"),
+        }
+        for row in rows
+    ]
+    if values:
+        session.execute(insert(models.PatientPgxDrugRecommendation), values)
     session.commit()
-    return inserted
+    return len(values)
 
 
 def list_patient_pgx_gene_calls(session: Session, patient_id: str) -> list[models.PatientPgxGeneCall]:
@@ -952,31 +1013,28 @@ def create_patient_expression_run(
 
 
 def add_patient_pathway_activity_rows(session: Session, patient_id: str, run_id: str, rows: list[dict]) -> int:
-    query = select(models.PatientPathwayActivity).where(models.PatientPathwayActivity.run_id == run_id)
-    existing = session.execute(query).scalars().all()
-    for row in existing:
-        session.delete(row)
-    inserted = 0
-    for row in rows:
-        session.add(
-            models.PatientPathwayActivity(
-                id=str(uuid4()),
-                patient_id=patient_id,
-                run_id=run_id,
-                pathway_id=str(row.get("pathway_id", "")),
-                pathway_name=str(row.get("pathway_name", "")),
-                activity_score=row.get("activity_score"),
-                p_value=row.get("p_value"),
-                percentile=row.get("percentile"),
-                method=str(row.get("method", "gsea_prerank")),
-                state=str(row.get("state", "unknown")),
-                reason_code=str(row.get("reason_code", "dataset_not_loaded")),
-                provenance=row.get("provenance", {}),
-            )
-        )
-        inserted += 1
+    session.execute(delete(models.PatientPathwayActivity).where(models.PatientPathwayActivity.run_id == run_id))
+    values = [
+        {
+            "id": str(uuid4()),
+            "patient_id": patient_id,
+            "run_id": run_id,
+            "pathway_id": str(row.get("pathway_id", "")),
+            "pathway_name": str(row.get("pathway_name", "")),
+            "activity_score": row.get("activity_score"),
+            "p_value": row.get("p_value"),
+            "percentile": row.get("percentile"),
+            "method": str(row.get("method", "gsea_prerank")),
+            "state": str(row.get("state", "unknown")),
+            "reason_code": str(row.get("reason_code", "dataset_not_loaded")),
+            "provenance": row.get("provenance", {}),
+        }
+        for row in rows
+    ]
+    if values:
+        session.execute(insert(models.PatientPathwayActivity), values)
     session.commit()
-    return inserted
+    return len(values)
 
 
 def list_patient_pathway_activity(session: Session, patient_id: str) -> list[models.PatientPathwayActivity]:
@@ -4,6 +4,10 @@ from statistics import median
 from pathmind_api.schemas import CompareMetrics, PathwayComparisonRow
 
 
+_VALID_ASSAY_TYPES = frozenset({"B", "F"})
+_EMPTY_VALIDITY_COMMENTS = frozenset({None, ""})
+
+
 def meets_assay_filters(activity: dict) -> bool:
     # NOTE: assay_organism is often None on ChEMBL activity records.
     # Organism filtering is applied at the target level instead
@@ -12,9 +16,9 @@ def meets_assay_filters(activity: dict) -> bool:
     organism_ok = organism is None or organism == "Homo sapiens"
     return (
         activity.get("standard_relation") == "="
-        and activity.get("assay_type") in {"B", "F"}
+        and activity.get("assay_type") in _VALID_ASSAY_TYPES
         and organism_ok
-        and activity.get("data_validity_comment") in {None, ""}
+        and activity.get("data_validity_comment") in _EMPTY_VALIDITY_COMMENTS
         and activity.get("pchembl_value") is not None
     )
 
@@ -40,7 +44,10 @@ def percentile(values: list[float], q: float) -> float:
         return 0.0
     if len(values) == 1:
         return float(values[0])
-    ordered = sorted(values)
+    return _percentile_sorted(sorted(values), q)
+
+
+def _percentile_sorted(ordered: list[float], q: float) -> float:
     pos = (len(ordered) - 1) * q
     lower = int(pos)
     upper = min(lower + 1, len(ordered) - 1)
@@ -53,12 +60,15 @@ def percentile(values: list[float], q: float) -> float:
 def assay_spread(values: list[float]) -> dict[str, float]:
     if not values:
         return {"min": 0.0, "median": 0.0, "max": 0.0, "iqr": 0.0}
+    # Sort once; median and quartiles are then read straight off the ordered list.
     ordered = sorted(values)
+    mid = len(ordered) // 2
+    middle = ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
     return {
         "min": float(ordered[0]),
-        "median": float(median(ordered)),
+        "median": float(middle),
         "max": float(ordered[-1]),
-        "iqr": round(percentile(ordered, 0.75) - percentile(ordered, 0.25), 6),
+        "iqr": round(_percentile_sorted(ordered, 0.75) - _percentile_sorted(ordered, 0.25), 6),
     }
 
 
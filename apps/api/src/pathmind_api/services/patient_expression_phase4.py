@@ -1,3 +1,5 @@
+from bisect import bisect_right
+
 from sqlalchemy.orm import Session
 
 from pathmind_api.repositories import (
@@ -87,7 +89,7 @@ class PatientExpressionServicePhase4:
                     if score is None:
                         item["percentile"] = None
                     else:
-                        rank = sum(1 for s in sorted_scores if s <= score)
+                        rank = bisect_right(sorted_scores, score)
                         item["percentile"] = round(100.0 * rank / len(sorted_scores), 1)
             elif len(scores) == 1:
                 for item in pathways:
@@ -112,13 +114,16 @@ class PatientExpressionServicePhase4:
         pathways: list[dict],
         version_snapshot: dict[str, str],
     ) -> str:
-        mapped_gene_count = int(upload_summary.get("mapping_summary", {}).get("mapped", 0))
+        mapping_summary = upload_summary.get("mapping_summary") or {}
+        mapped_gene_count = int(mapping_summary.get("mapped", 0))
+        id_type = str(upload_summary.get("id_type", "unknown"))
+        gene_count = int(upload_summary.get("gene_count", 0))
         run = create_patient_expression_run(
             session,
             patient_id=patient_id,
             filename=filename,
-            id_type=str(upload_summary.get("id_type", "unknown")),
-            gene_count=int(upload_summary.get("gene_count", 0)),
+            id_type=id_type,
+            gene_count=gene_count,
             mapped_gene_count=mapped_gene_count,
             state="positive" if pathways else "unknown",
             reason_code="expression_processed" if pathways else "limited_data",
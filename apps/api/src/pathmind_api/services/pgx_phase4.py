@@ -1,6 +1,8 @@
 import csv
+import heapq
 import json
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from operator import itemgetter
 from pathlib import Path
 
 from sqlalchemy.orm import Session
@@ -42,6 +44,7 @@ _STANDARD_PHENOTYPES = {
 }
 
 
+@lru_cache(maxsize=512)
 def _normalize_phenotype(raw: str) -> str:
     lowered = raw.strip().lower()
     for standard in sorted(_STANDARD_PHENOTYPES, key=len, reverse=True):
@@ -83,7 +86,7 @@ class PgxServicePhase4:
         self.phase4_data_dir = Path(phase4_data_dir)
         self.runner = runner
 
-    @lru_cache(maxsize=1)
+    @cached_property
     def _cpic_rules(self) -> list[dict]:
         root = self.phase4_data_dir
         candidates = [
@@ -107,19 +110,28 @@ class PgxServicePhase4:
             reader = csv.DictReader(handle, delimiter=delimiter)
             return [dict(row) for row in reader]
 
+    @cached_property
+    def _cpic_rules_index(self) -> dict[str, dict[str, list[tuple[int, dict]]]]:
+        # Rows keep their file position so lookups can return matches in CPIC file order.
+        # Rows without a phenotype apply to every phenotype and live under the "" key.
+        index: dict[str, dict[str, list[tuple[int, dict]]]] = {}
+        for position, row in enumerate(self._cpic_rules):
+            row_gene = _normalize(str(row.get("gene") or ""))
+            row_phenotype = _normalize_phenotype(str(row.get("phenotype") or ""))
+            index.setdefault(row_gene, {}).setdefault(row_phenotype, []).append((position, row))
+        return index
+
     def _match_rules(self, gene: str, phenotype: str | None) -> list[dict]:
         gene_key = _normalize(gene)
         phenotype_key = _normalize_phenotype(phenotype or "")
-        matches: list[dict] = []
-        for row in self._cpic_rules():
-            row_gene = _normalize(str(row.get("gene") or ""))
-            if row_gene != gene_key:
-                continue
-            row_phenotype = _normalize_phenotype(str(row.get("phenotype") or ""))
-            if row_phenotype and phenotype_key and row_phenotype != phenotype_key:
-                continue
-            matches.append(row)
-        return matches
+        rules_by_phenotype = self._cpic_rules_index.get(gene_key)
+        if not rules_by_phenotype:
+            return []
+        if not phenotype_key:
+            buckets = list(rules_by_phenotype.values())
+        else:
+            buckets = [rules_by_phenotype.get(phenotype_key, []), rules_by_phenotype.get("", [])]
+        return [row for _, row in heapq.merge(*buckets, key=itemgetter(0))]
 
     def process_vcf(self, vcf_path: Path, version_snapshot: dict[str, str]) -> PgxProcessingResult:
         parsed_calls = self.runner.run_from_vcf(vcf_path)
@@ -164,7 +176,7 @@ class PgxServicePhase4:
             )
 
         snapshot = dict(version_snapshot)
-        snapshot["cpic_rules_loaded"] = str(len(self._cpic_rules()))
+        snapshot["cpic_rules_loaded"] = str(len(self._cpic_rules))
         return PgxProcessingResult(gene_calls=normalized_calls, drug_recommendations=recommendations, version_snapshot=snapshot)
 
     def persist_patient_results(self, session: Session, *, patient_id: str, result: PgxProcessingResult) -> None:
@@ -1,18 +1,43 @@
-import json
+import asyncio
 import subprocess
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
 from pathmind_api.schemas_phase4 import PgxGeneCallParsed
 
+_GENE_CALL_HEADER = b"##PATHMIND_GENE_CALL="
+_HEADER_BYTE = ord("#")
 
-def _parse_inline_call(payload: str) -> PgxGeneCallParsed | None:
+
+def _find_info_value(info: bytes, key: bytes) -> bytes | None:
+    tag = key + b"="
+    if info.startswith(tag):
+        start = len(tag)
+    else:
+        index = info.find(b";" + tag)
+        if index < 0:
+            return None
+        start = index + len(tag) + 1
+    end = info.find(b";", start)
+    return info[start:] if end < 0 else info[start:end]
+
+
+# (gene, diplotype, phenotype, activity_score, provenance source)
+_InlineCallFields = tuple[str, str | None, str | None, float | None, str]
+
+
+@lru_cache(maxsize=1024)
+def _parse_inline_fields(payload: str) -> _InlineCallFields | None:
     raw = payload.strip()
-    if not raw:
+    # Gene symbols start with a letter; anything else that is not JSON is junk.
+    if not raw or (raw[0] != "{" and not raw[0].isalpha()):
         return None
     if raw.startswith("{") and raw.endswith("}"):
         try:
-            parsed = json.loads(raw)
+            parsed = orjson.loads(raw)
             gene = str(parsed.get("gene", "")).strip().upper()
             if not gene:
                 return None
@@ -21,15 +46,16 @@ def _parse_inline_call(payload: str) -> PgxGeneCallParsed | None:
                 activity_value = float(activity) if activity not in {None, ""} else None
             except Exception:
                 activity_value = None
-            return PgxGeneCallParsed(
+            # Validate once so only clean, immutable field values are cached.
+            call = PgxGeneCallParsed(
                 gene=gene,
                 diplotype=parsed.get("diplotype"),
                 phenotype=parsed.get("phenotype"),
                 activity_score=activity_value,
                 state="unknown",
                 reason_code="parsed_from_vcf_annotation",
-                provenance={"source": "vcf_annotation_json"},
             )
+            return (call.gene, call.diplotype, call.phenotype, call.activity_score, "vcf_annotation_json")
         except Exception:
             return None
 
@@ -45,14 +71,29 @@ def _parse_inline_call(payload: str) -> PgxGeneCallParsed | None:
             activity_value = float(parts[3])
         except Exception:
             activity_value = None
-    return PgxGeneCallParsed(
+    return (
+        gene,
+        parts[1] or None if len(parts) > 1 else None,
+        parts[2] or None if len(parts) > 2 else None,
+        activity_value,
+        "vcf_annotation_pipe",
+    )
+
+
+def _parse_inline_call(payload: str) -> PgxGeneCallParsed | None:
+    # The cache holds plain tuples; every call gets its own model and provenance dict.
+    fields = _parse_inline_fields(payload)
+    if fields is None:
+        return None
+    gene, diplotype, phenotype, activity_score, source = fields
+    return PgxGeneCallParsed.model_construct(
         gene=gene,
-        diplotype=parts[1] or None if len(parts) > 1 else None,
-        phenotype=parts[2] or None if len(parts) > 2 else None,
-        activity_score=activity_value,
+        diplotype=diplotype,
+        phenotype=phenotype,
+        activity_score=activity_score,
         state="unknown",
         reason_code="parsed_from_vcf_annotation",
-        provenance={"source": "vcf_annotation_pipe"},
+        provenance={"source": source},
     )
 
 
@@ -71,109 +112,146 @@ class PharmcatRunnerPhase4:
         self.timeout_seconds = max(10, timeout_seconds)
 
     def run_from_vcf(self, vcf_path: Path) -> list[PgxGeneCallParsed]:
-        if self.pharmcat_jar_path:
-            jar = Path(self.pharmcat_jar_path)
-            if jar.exists():
-                jar_output = self._run_pharmcat_subprocess(vcf_path, jar)
-                if jar_output:
-                    return jar_output
+        jar = self._pharmcat_jar()
+        if jar is not None:
+            jar_output = self._run_pharmcat_subprocess(vcf_path, jar)
+            if jar_output:
+                return jar_output
         return self._fallback_parse_vcf(vcf_path)
 
+    async def arun_from_vcf(self, vcf_path: Path) -> list[PgxGeneCallParsed]:
+        """Async variant of run_from_vcf that keeps the subprocess and file parsing off the event loop."""
+        jar = self._pharmcat_jar()
+        if jar is not None:
+            jar_output = await self._arun_pharmcat_subprocess(vcf_path, jar)
+            if jar_output:
+                return jar_output
+        return await asyncio.to_thread(self._fallback_parse_vcf, vcf_path)
+
+    def _pharmcat_jar(self) -> Path | None:
+        if not self.pharmcat_jar_path:
+            return None
+        jar = Path(self.pharmcat_jar_path)
+        return jar if jar.exists() else None
+
+    def _pharmcat_command(self, vcf_path: Path, jar_path: Path, output_dir: Path) -> list[str]:
+        return [
+            self.java_bin,
+            "-jar",
+            str(jar_path),
+            "-vcf",
+            str(vcf_path),
+            "-o",
+            str(output_dir),
+        ]
+
     def _run_pharmcat_subprocess(self, vcf_path: Path, jar_path: Path) -> list[PgxGeneCallParsed]:
         with tempfile.TemporaryDirectory(prefix="pathmind-pharmcat-") as temp_dir:
             output_dir = Path(temp_dir)
-            command = [
-                self.java_bin,
-                "-jar",
-                str(jar_path),
-                "-vcf",
-                str(vcf_path),
-                "-o",
-                str(output_dir),
-            ]
             try:
                 subprocess.run(
-                    command,
+                    self._pharmcat_command(vcf_path, jar_path, output_dir),
                     check=True,
-                    capture_output=True,
-                    text=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
                     timeout=self.timeout_seconds,
                 )
             except Exception:
                 return []
+            return self._read_pharmcat_report(output_dir)
 
-            candidates = [
-                output_dir / "report.json",
-                output_dir / "pharmcat_report.json",
-                output_dir / "results.json",
-            ]
-            payload_file = next((path for path in candidates if path.exists()), None)
-            if payload_file is None:
-                return []
+    async def _arun_pharmcat_subprocess(self, vcf_path: Path, jar_path: Path) -> list[PgxGeneCallParsed]:
+        with tempfile.TemporaryDirectory(prefix="pathmind-pharmcat-") as temp_dir:
+            output_dir = Path(temp_dir)
             try:
-                payload = json.loads(payload_file.read_text(encoding="utf-8"))
+                process = await asyncio.create_subprocess_exec(
+                    *self._pharmcat_command(vcf_path, jar_path, output_dir),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
             except Exception:
                 return []
-
-            calls: list[PgxGeneCallParsed] = []
-            gene_rows = payload.get("gene_calls") if isinstance(payload, dict) else None
-            if not isinstance(gene_rows, list):
+            try:
+                return_code = await asyncio.wait_for(process.wait(), timeout=self.timeout_seconds)
+            except TimeoutError:
                 return []
-            for row in gene_rows:
-                if not isinstance(row, dict):
-                    continue
-                gene = str(row.get("gene", "")).strip().upper()
-                if not gene:
-                    continue
-                activity = row.get("activity_score")
-                try:
-                    activity_value = float(activity) if activity not in {None, ""} else None
-                except Exception:
-                    activity_value = None
-                calls.append(
-                    PgxGeneCallParsed(
-                        gene=gene,
-                        diplotype=row.get("diplotype"),
-                        phenotype=row.get("phenotype"),
-                        activity_score=activity_value,
-                        state="unknown",
-                        reason_code="parsed_from_pharmcat",
-                        provenance={"source": "pharmcat_subprocess", "output_file": str(payload_file.name)},
-                    )
+            finally:
+                # Covers the timeout and task cancellation, so no Java process outlives the request.
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+            if return_code != 0:
+                return []
+            return await asyncio.to_thread(self._read_pharmcat_report, output_dir)
+
+    def _read_pharmcat_report(self, output_dir: Path) -> list[PgxGeneCallParsed]:
+        candidates = [
+            output_dir / "report.json",
+            output_dir / "pharmcat_report.json",
+            output_dir / "results.json",
+        ]
+        payload_file = next((path for path in candidates if path.exists()), None)
+        if payload_file is None:
+            return []
+        try:
+            payload = orjson.loads(payload_file.read_bytes())
+        except Exception:
+            return []
+
+        calls: list[PgxGeneCallParsed] = []
+        gene_rows = payload.get("gene_calls") if isinstance(payload, dict) else None
+        if not isinstance(gene_rows, list):
+            return []
+        for row in gene_rows:
+            if not isinstance(row, dict):
+                continue
+            gene = str(row.get("gene", "")).strip().upper()
+            if not gene:
+                continue
+            activity = row.get("activity_score")
+            try:
+                activity_value = float(activity) if activity not in {None, ""} else None
+            except Exception:
+                activity_value = None
+            calls.append(
+                PgxGeneCallParsed(
+                    gene=gene,
+                    diplotype=row.get("diplotype"),
+                    phenotype=row.get("phenotype"),
+                    activity_score=activity_value,
+                    state="unknown",
+                    reason_code="parsed_from_pharmcat",
+                    provenance={"source": "pharmcat_subprocess", "output_file": str(payload_file.name)},
                 )
-            return calls
+            )
+        return calls
 
     def _fallback_parse_vcf(self, vcf_path: Path) -> list[PgxGeneCallParsed]:
         calls_by_gene: dict[str, PgxGeneCallParsed] = {}
-        with vcf_path.open("r", encoding="utf-8", errors="replace") as handle:
+        with vcf_path.open("rb") as handle:
             for line in handle:
-                if line.startswith("##PATHMIND_GENE_CALL="):
-                    payload = line.split("=", 1)[1]
-                    parsed = _parse_inline_call(payload)
-                    if parsed:
-                        calls_by_gene[parsed.gene] = parsed
-                    continue
-                if line.startswith("#"):
+                if line[0] == _HEADER_BYTE:
+                    if line.startswith(_GENE_CALL_HEADER):
+                        payload = line[len(_GENE_CALL_HEADER) :].decode("utf-8", "replace")
+                        parsed = _parse_inline_call(payload)
+                        if parsed:
+                            calls_by_gene[parsed.gene] = parsed
                     continue
-                parts = line.strip().split("\t")
+                parts = line.strip().split(b"\t", 8)
                 if len(parts) < 8:
                     continue
-                info = parts[7]
-                gene = None
-                for token in info.split(";"):
-                    if token.startswith("GENE="):
-                        gene = token.replace("GENE=", "", 1).strip().upper()
-                        break
+                raw_gene = _find_info_value(parts[7], b"GENE")
+                if raw_gene is None:
+                    continue
+                gene = raw_gene.strip().decode("utf-8", "replace").upper()
                 if not gene:
                     continue
                 if gene not in calls_by_gene:
-                    calls_by_gene[gene] = PgxGeneCallParsed(
+                    calls_by_gene[gene] = PgxGeneCallParsed.model_construct(
                         gene=gene,
                         state="unknown",
                         reason_code="gene_not_called",
                         provenance={"source": "vcf_info_gene_tag"},
                     )
 
-        if not calls_by_gene:
-            return []
-        return sorted(calls_by_gene.values(), key=lambda item: item.gene)
+        return [calls_by_gene[gene] for gene in sorted(calls_by_gene)]
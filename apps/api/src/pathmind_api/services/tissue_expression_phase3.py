@@ -1,22 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
+import httpx
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from pathmind_api.clients.gtex import GTExClient
 from pathmind_api.clients.hpa import HPAClient
 from pathmind_api.etl.phase3_ingest import _merge_expression_rows
+from pathmind_api.models import TissueExpression
 from pathmind_api.repositories import (
     get_dataset_cache_meta,
     get_gene_identifier,
-    get_gene_identifier_by_uniprot,
+    get_gene_identifiers_by_uniprots,
+    get_latest_expression_update,
     get_pathway_metadata,
     get_tissue_expression_for_gene,
+    get_tissue_expression_for_genes,
     get_uniprot_ids_for_pathway,
     latest_source_release_versions,
-    upsert_gene_identifier_map,
+    upsert_gene_identifier_maps,
     upsert_tissue_expression_rows,
 )
 from pathmind_api.schemas_phase3 import (
@@ -31,25 +38,27 @@ from pathmind_api.schemas_phase3 import (
 
 log = logging.getLogger(__name__)
 
+_EXPRESSED_PROTEIN_LEVELS = frozenset({"Medium", "High"})
+
 
 def _signal_for_measurement(*, gtex_tpm: float | None, hpa_protein_level: str | None, gtex_present: bool, hpa_present: bool) -> EvidenceRecord:
-    if gtex_present or hpa_present:
-        expression_positive = (gtex_tpm is not None and gtex_tpm >= 1.0) or (hpa_protein_level in {"Medium", "High"})
-        if expression_positive:
-            return EvidenceRecord(
-                state="positive",
-                reason_code="measured_expression_present",
-                provenance={"gtex_tpm": gtex_tpm, "hpa_protein_level": hpa_protein_level},
-            )
+    if not (gtex_present or hpa_present):
+        return EvidenceRecord(
+            state="unknown",
+            reason_code="measurement_missing",
+            provenance={"gtex_present": gtex_present, "hpa_present": hpa_present},
+        )
+    expression_positive = (gtex_tpm is not None and gtex_tpm >= 1.0) or (hpa_protein_level in _EXPRESSED_PROTEIN_LEVELS)
+    if expression_positive:
         return EvidenceRecord(
-            state="negative",
-            reason_code="measured_expression_low",
+            state="positive",
+            reason_code="measured_expression_present",
             provenance={"gtex_tpm": gtex_tpm, "hpa_protein_level": hpa_protein_level},
         )
     return EvidenceRecord(
-        state="unknown",
-        reason_code="measurement_missing",
-        provenance={"gtex_present": gtex_present, "hpa_present": hpa_present},
+        state="negative",
+        reason_code="measured_expression_low",
+        provenance={"gtex_tpm": gtex_tpm, "hpa_protein_level": hpa_protein_level},
     )
 
 
@@ -125,11 +134,14 @@ class TissueExpressionServicePhase3:
         gtex_client: GTExClient | None = None,
         hpa_client: HPAClient | None = None,
         cache_ttl_hours: int = 168,
+        max_concurrent_genes: int = 8,
     ) -> None:
         self.top_tissues = [item.strip() for item in (top_tissues or []) if item.strip()]
+        self._top_tissue_rank = {name: index for index, name in enumerate(self.top_tissues)}
         self.gtex_client = gtex_client
         self.hpa_client = hpa_client
         self.cache_ttl = timedelta(hours=cache_ttl_hours)
+        self.max_concurrent_genes = max(1, max_concurrent_genes)
 
     async def _ensure_gene_cached(self, session: Session, gene_symbol: str) -> None:
         """Fetch tissue data from GTEx + HPA APIs if not already in the DB (or stale)."""
@@ -137,16 +149,13 @@ class TissueExpressionServicePhase3:
         if not gene_key:
             return
 
-        # Check existing DB rows
-        existing = get_tissue_expression_for_gene(session, gene_key)
-        if existing:
-            # Check freshness via updated_at of the first row
-            newest = max((row.updated_at for row in existing), default=None)
-            if newest is not None:
-                if newest.tzinfo is None:
-                    newest = newest.replace(tzinfo=timezone.utc)
-                if datetime.now(timezone.utc) - newest < self.cache_ttl:
-                    return  # cache hit — data is fresh
+        # Check freshness via the newest updated_at without loading the rows
+        newest = get_latest_expression_update(session, gene_key)
+        if newest is not None:
+            if newest.tzinfo is None:
+                newest = newest.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - newest < self.cache_ttl:
+                return  # cache hit — data is fresh
 
         # Resolve gene symbol → gencodeId + ensemblId via GTEx reference
         gencode_id = ""
@@ -160,21 +169,30 @@ class TissueExpressionServicePhase3:
             except Exception:
                 log.warning("GTEx gene resolution failed for %s", gene_key, exc_info=True)
 
-        # Fetch from APIs
-        all_rows: list[dict] = []
+        # Fetch from APIs concurrently
+        sources: list[str] = []
+        tasks = []
         if self.gtex_client is not None and gencode_id:
-            try:
-                gtex_rows = await self.gtex_client.fetch_median_expression(gencode_id, gene_key)
-                all_rows.extend(gtex_rows)
-            except Exception:
-                log.warning("GTEx API fetch failed for %s — proceeding without GTEx", gene_key, exc_info=True)
-
+            sources.append("GTEx")
+            tasks.append(self.gtex_client.fetch_median_expression(gencode_id, gene_key))
         if self.hpa_client is not None and ensembl_id:
-            try:
-                hpa_rows = await self.hpa_client.fetch_tissue_expression(ensembl_id, gene_key)
-                all_rows.extend(hpa_rows)
-            except Exception:
-                log.warning("HPA API fetch failed for %s — proceeding without HPA", gene_key, exc_info=True)
+            sources.append("HPA")
+            tasks.append(self.hpa_client.fetch_tissue_expression(ensembl_id, gene_key))
+
+        all_rows: list[dict] = []
+        for source, result in zip(sources, await asyncio.gather(*tasks, return_exceptions=True), strict=True):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                log.warning(
+                    "%s API fetch failed for %s — proceeding without %s",
+                    source,
+                    gene_key,
+                    source,
+                    exc_info=(type(result), result, result.__traceback__),
+                )
+                continue
+            all_rows.extend(result)
 
         if not all_rows:
             return  # nothing to cache
@@ -183,17 +201,31 @@ class TissueExpressionServicePhase3:
         upsert_tissue_expression_rows(session, merged)
 
         # Also register gene in identifier map
-        for row in merged:
-            upsert_gene_identifier_map(
-                session,
-                gene_symbol=row["gene_symbol"],
-                ensembl_id=ensembl_id or None,
-                uniprot_id=row.get("uniprot_id"),
-                aliases=[],
-            )
+        upsert_gene_identifier_maps(
+            session,
+            [
+                {"gene_symbol": row["gene_symbol"], "ensembl_id": ensembl_id or None, "uniprot_id": row.get("uniprot_id"), "aliases": []}
+                for row in merged
+            ],
+        )
 
         log.debug("Cached %d tissue rows for %s from API", len(merged), gene_key)
 
+    async def _ensure_genes_cached(self, session: Session, gene_symbols: list[str]) -> None:
+        """Cache many genes with bounded fan-out; a DB or HTTP failure for one gene leaves the others cached."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_genes)
+
+        async def _cache_one(gene_symbol: str) -> None:
+            async with semaphore:
+                try:
+                    await self._ensure_gene_cached(session, gene_symbol)
+                except (SQLAlchemyError, httpx.HTTPError):
+                    # The shared session is unusable after a failed write; reset it for the other genes.
+                    session.rollback()
+                    log.warning("Tissue expression caching failed for %s", gene_symbol, exc_info=True)
+
+        await asyncio.gather(*(_cache_one(gene) for gene in gene_symbols))
+
     async def by_gene(self, session: Session, gene: str) -> TissueExpressionResponse:
         gene_key = gene.strip().upper()
         mapping = get_gene_identifier(session, gene_key)
@@ -204,25 +236,27 @@ class TissueExpressionServicePhase3:
 
         rows = get_tissue_expression_for_gene(session, canonical_gene)
         version_map = latest_source_release_versions(session)
+        return TissueExpressionResponse(
+            gene_symbol=canonical_gene,
+            expression=self._expression_points(canonical_gene, rows),
+            version_snapshot={
+                "gtex": version_map.get("gtex", "unknown"),
+                "hpa": version_map.get("hpa", "unknown"),
+            },
+        )
 
+    def _expression_points(self, canonical_gene: str, rows: list[TissueExpression]) -> list[TissueExpressionPoint]:
         if not rows:
-            return TissueExpressionResponse(
-                gene_symbol=canonical_gene,
-                expression=[
-                    TissueExpressionPoint(
-                        tissue="unknown",
-                        evidence=EvidenceRecord(
-                            state="unknown",
-                            reason_code="dataset_not_loaded_or_gene_missing",
-                            provenance={"gene_symbol": canonical_gene},
-                        ),
-                    )
-                ],
-                version_snapshot={
-                    "gtex": version_map.get("gtex", "unknown"),
-                    "hpa": version_map.get("hpa", "unknown"),
-                },
-            )
+            return [
+                TissueExpressionPoint(
+                    tissue="unknown",
+                    evidence=EvidenceRecord(
+                        state="unknown",
+                        reason_code="dataset_not_loaded_or_gene_missing",
+                        provenance={"gene_symbol": canonical_gene},
+                    ),
+                )
+            ]
 
         points = [
             TissueExpressionPoint(
@@ -239,27 +273,26 @@ class TissueExpressionServicePhase3:
             )
             for row in rows
         ]
-        points.sort(key=lambda item: ((item.gtex_tpm or 0.0), (item.hpa_rna_nx or 0.0)), reverse=True)
-        if self.top_tissues:
-            rank = {name: index for index, name in enumerate(self.top_tissues)}
-            points.sort(key=lambda item: rank.get(item.tissue, 10_000))
-        return TissueExpressionResponse(
-            gene_symbol=canonical_gene,
-            expression=points,
-            version_snapshot={
-                "gtex": version_map.get("gtex", "unknown"),
-                "hpa": version_map.get("hpa", "unknown"),
-            },
-        )
+        rank = self._top_tissue_rank
+        points.sort(key=lambda item: (rank.get(item.tissue, 10_000), -(item.gtex_tpm or 0.0), -(item.hpa_rna_nx or 0.0)))
+        return points
 
     async def for_pathway(self, session: Session, pathway_id: str) -> PathwayExpressionResponse:
         pathway = get_pathway_metadata(session, pathway_id)
         name = pathway.pathway_name if pathway is not None else pathway_id
         uniprot_ids = get_uniprot_ids_for_pathway(session, pathway_id, max_items=500)
-        rows: list[PathwayExpressionGeneRow] = []
+        mappings = get_gene_identifiers_by_uniprots(session, uniprot_ids)
+        gene_symbols = sorted({mapping.gene_symbol for mapping in mappings.values()})
 
+        # Ensure API data is cached for every mapped gene, then read all rows in one query
+        await self._ensure_genes_cached(session, gene_symbols)
+        expression_by_gene: dict[str, list[TissueExpression]] = defaultdict(list)
+        for expression_row in get_tissue_expression_for_genes(session, gene_symbols):
+            expression_by_gene[expression_row.gene_symbol].append(expression_row)
+
+        rows: list[PathwayExpressionGeneRow] = []
         for uniprot_id in uniprot_ids:
-            mapping = get_gene_identifier_by_uniprot(session, uniprot_id)
+            mapping = mappings.get(uniprot_id)
             if mapping is None:
                 rows.append(
                     PathwayExpressionGeneRow(
@@ -274,17 +307,17 @@ class TissueExpressionServicePhase3:
                     )
                 )
                 continue
-            gene_response = await self.by_gene(session, mapping.gene_symbol)
+            tissues = self._expression_points(mapping.gene_symbol, expression_by_gene.get(mapping.gene_symbol, []))[:8]
             rows.append(
                 PathwayExpressionGeneRow(
                     gene_symbol=mapping.gene_symbol,
                     uniprot_id=mapping.uniprot_id,
                     evidence=EvidenceRecord(
-                        state="positive" if any(point.evidence.state == "positive" for point in gene_response.expression) else "unknown",
+                        state="positive" if any(point.evidence.state == "positive" for point in tissues) else "unknown",
                         reason_code="pathway_gene_tissue_overlay",
                         provenance={"pathway_id": pathway_id},
                     ),
-                    tissues=gene_response.expression[: min(len(gene_response.expression), 8)],
+                    tissues=tissues,
                 )
             )
 
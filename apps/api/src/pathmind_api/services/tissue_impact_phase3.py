@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from statistics import median
@@ -11,10 +12,10 @@ from pathmind_api.clients.gtex import GTExClient
 from pathmind_api.clients.hpa import HPAClient
 from pathmind_api.etl.phase3_ingest import _merge_expression_rows
 from pathmind_api.repositories import (
-    get_tissue_expression_for_gene,
+    get_latest_expression_update,
     get_tissue_expression_for_genes,
     latest_source_release_versions,
-    upsert_gene_identifier_map,
+    upsert_gene_identifier_maps,
     upsert_tissue_expression_rows,
 )
 from pathmind_api.schemas_phase3 import EvidenceRecord, TissueImpactCell, TissueImpactResponse
@@ -32,6 +33,12 @@ _DEFAULT_TISSUE_EXPOSURE = {
     "Adipose Tissue": 2.5,
 }
 
+_KEY_RISK_BY_TISSUE = {
+    "Liver": "dili_risk",
+    "Heart": "qt_risk",
+    "Kidney": "renal_risk",
+}
+
 
 class TissueImpactServicePhase3:
     def __init__(
@@ -44,7 +51,8 @@ class TissueImpactServicePhase3:
         cache_ttl_hours: int = 168,
     ) -> None:
         self.chembl = chembl
-        self.top_tissues = top_tissues or list(_DEFAULT_TISSUE_EXPOSURE.keys())
+        self.top_tissues = tuple(top_tissues or _DEFAULT_TISSUE_EXPOSURE.keys())
+        self._exposure_by_tissue = {tissue: _DEFAULT_TISSUE_EXPOSURE.get(tissue, 1.0) for tissue in self.top_tissues}
         self.gtex_client = gtex_client
         self.hpa_client = hpa_client
         self.cache_ttl = timedelta(hours=cache_ttl_hours)
@@ -55,14 +63,12 @@ class TissueImpactServicePhase3:
         if not gene_key:
             return
 
-        existing = get_tissue_expression_for_gene(session, gene_key)
-        if existing:
-            newest = max((row.updated_at for row in existing), default=None)
-            if newest is not None:
-                if newest.tzinfo is None:
-                    newest = newest.replace(tzinfo=timezone.utc)
-                if datetime.now(timezone.utc) - newest < self.cache_ttl:
-                    return
+        newest = get_latest_expression_update(session, gene_key)
+        if newest is not None:
+            if newest.tzinfo is None:
+                newest = newest.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - newest < self.cache_ttl:
+                return
 
         # Resolve gene symbol → gencodeId + ensemblId
         gencode_id = ""
@@ -76,37 +82,45 @@ class TissueImpactServicePhase3:
             except Exception:
                 log.warning("GTEx gene resolution failed for %s", gene_key, exc_info=True)
 
-        all_rows: list[dict] = []
+        sources: list[str] = []
+        tasks = []
         if self.gtex_client is not None and gencode_id:
-            try:
-                all_rows.extend(await self.gtex_client.fetch_median_expression(gencode_id, gene_key))
-            except Exception:
-                log.warning("GTEx fetch failed for %s in tissue-impact", gene_key, exc_info=True)
-
+            sources.append("GTEx")
+            tasks.append(self.gtex_client.fetch_median_expression(gencode_id, gene_key))
         if self.hpa_client is not None and ensembl_id:
-            try:
-                all_rows.extend(await self.hpa_client.fetch_tissue_expression(ensembl_id, gene_key))
-            except Exception:
-                log.warning("HPA fetch failed for %s in tissue-impact", gene_key, exc_info=True)
+            sources.append("HPA")
+            tasks.append(self.hpa_client.fetch_tissue_expression(ensembl_id, gene_key))
+
+        all_rows: list[dict] = []
+        for source, result in zip(sources, await asyncio.gather(*tasks, return_exceptions=True), strict=True):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                log.warning(
+                    "%s fetch failed for %s in tissue-impact",
+                    source,
+                    gene_key,
+                    exc_info=(type(result), result, result.__traceback__),
+                )
+                continue
+            all_rows.extend(result)
 
         if not all_rows:
             return
 
         merged = _merge_expression_rows(all_rows)
         upsert_tissue_expression_rows(session, merged)
-        for row in merged:
-            upsert_gene_identifier_map(
-                session,
-                gene_symbol=row["gene_symbol"],
-                ensembl_id=ensembl_id or None,
-                uniprot_id=row.get("uniprot_id"),
-                aliases=[],
-            )
+        upsert_gene_identifier_maps(
+            session,
+            [
+                {"gene_symbol": row["gene_symbol"], "ensembl_id": ensembl_id or None, "uniprot_id": row.get("uniprot_id"), "aliases": []}
+                for row in merged
+            ],
+        )
 
     async def evaluate(self, session: Session, drug_id: str) -> TissueImpactResponse:
         activities = await self.chembl.fetch_activities(drug_id)
         target_values: dict[str, list[float]] = {}
-        target_ids: set[str] = set()
         for activity in activities:
             target_id = activity.get("target_chembl_id")
             raw = activity.get("pchembl_value")
@@ -117,36 +131,48 @@ class TissueImpactServicePhase3:
             except Exception:
                 continue
             target_values.setdefault(str(target_id), []).append(value)
-            target_ids.add(str(target_id))
 
-        details = await self.chembl.fetch_target_details(sorted(target_ids)) if target_ids else {}
+        details = await self.chembl.fetch_target_details(sorted(target_values)) if target_values else {}
         target_genes = sorted(
             {
                 str((details.get(target_id) or {}).get("gene_symbol") or "").strip().upper()
-                for target_id in target_ids
+                for target_id in target_values
             }
         )
         target_genes = [item for item in target_genes if item]
-        potency_values = [median(values) for values in target_values.values() if values]
-        potency_factor = (median(potency_values) / 10.0) if potency_values else None
+        if not target_values:
+            potency_factor = None
+        elif len(target_values) == 1:
+            (values,) = target_values.values()
+            potency_factor = median(values) / 10.0
+        else:
+            potency_factor = median([median(values) for values in target_values.values()]) / 10.0
 
         # Pre-fetch tissue data for each target gene via API if needed
         for gene in target_genes:
             await self._ensure_gene_cached(session, gene)
 
         tissue_rows = get_tissue_expression_for_genes(session, target_genes)
-        by_tissue: dict[str, list[float]] = {}
+        # Running (sum, count) per reported tissue; rows for other tissues are skipped.
+        expression_totals: dict[str, list[float]] = {}
         for row in tissue_rows:
-            if row.gtex_tpm is not None:
-                by_tissue.setdefault(row.tissue, []).append(row.gtex_tpm)
-            elif row.hpa_rna_nx is not None:
-                by_tissue.setdefault(row.tissue, []).append(row.hpa_rna_nx)
+            if row.tissue not in self._exposure_by_tissue:
+                continue
+            value = row.gtex_tpm if row.gtex_tpm is not None else row.hpa_rna_nx
+            if value is None:
+                continue
+            totals = expression_totals.get(row.tissue)
+            if totals is None:
+                expression_totals[row.tissue] = [value, 1]
+            else:
+                totals[0] += value
+                totals[1] += 1
 
         cells: list[TissueImpactCell] = []
         for tissue in self.top_tissues:
-            expression_values = by_tissue.get(tissue, [])
-            expression_score = (sum(expression_values) / len(expression_values)) if expression_values else None
-            exposure_score = _DEFAULT_TISSUE_EXPOSURE.get(tissue, 1.0)
+            totals = expression_totals.get(tissue)
+            expression_score = (totals[0] / totals[1]) if totals else None
+            exposure_score = self._exposure_by_tissue[tissue]
             if expression_score is None or potency_factor is None:
                 cells.append(
                     TissueImpactCell(
@@ -169,16 +195,11 @@ class TissueImpactServicePhase3:
             if impact >= 2.0:
                 state = "positive"
                 reason = "high_relative_impact"
+                key_risk = _KEY_RISK_BY_TISSUE.get(tissue)
             else:
                 state = "negative"
                 reason = "low_relative_impact"
-            key_risk = None
-            if tissue == "Liver" and state == "positive":
-                key_risk = "dili_risk"
-            elif tissue == "Heart" and state == "positive":
-                key_risk = "qt_risk"
-            elif tissue == "Kidney" and state == "positive":
-                key_risk = "renal_risk"
+                key_risk = None
             cells.append(
                 TissueImpactCell(
                     tissue=tissue,
@@ -1,40 +1,23 @@
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import count
 import os
-from uuid import uuid4
+from random import Random
+from typing import Any, Final
+from uuid import UUID
 
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 os.environ.setdefault("PATHMIND_DATABASE_URL", "sqlite://")
 
 from pathmind_api.cache import InMemoryCache
+from pathmind_api.clients.base import HealthResult
 from pathmind_api.database import Base, get_db
-from pathmind_api.deps import (
-    get_analysis_service,
-    get_aop_phase3_service,
-    get_cache,
-    get_causal_chain_service,
-    get_drug_response_phase4_service,
-    get_enrichment_service,
-    get_expression_ingest_service,
-    get_herg_phase3_service,
-    get_job_service,
-    get_lincs_provider,
-    get_patient_expression_phase4_service,
-    get_patient_profile_phase4_service,
-    get_phase4_dataset_service,
-    get_phase3_dataset_service,
-    get_pgx_phase4_service,
-    get_predict_targets_service,
-    get_selectivity_service,
-    get_tissue_expression_phase3_service,
-    get_tissue_impact_phase3_service,
-    get_toxicity_phase3_service,
-    get_tf_activity_service,
-)
+import pathmind_api.deps as deps
 from pathmind_api.main import create_app
 from pathmind_api.schemas import (
     AnalysisParams,
@@ -100,11 +83,15 @@ from pathmind_api.schemas_phase4 import (
 from pathmind_api.service import AmbiguousDrugError, AnalysisService, FatalAnalysisError
 
 
-def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> AnalysisResult:
-    analysis_id = str(uuid4())
+@lru_cache(maxsize=1)
+def _build_app():
+    return create_app()
+
+
+def _build_analysis_template(drug_name: str) -> AnalysisResult:
     canonical = f"CHEMBL-{drug_name.upper()}"
     targets = [
-        TargetHit(
+        TargetHit.model_construct(
             target_chembl_id=f"T-{drug_name[:3]}-1",
             target_name="EGFR",
             uniprot_id="P00533",
@@ -116,7 +103,7 @@ def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> Anal
             low_confidence=False,
             source_assay_ids=["A1", "A2"],
         ),
-        TargetHit(
+        TargetHit.model_construct(
             target_chembl_id=f"T-{drug_name[:3]}-2",
             target_name="ERBB2",
             uniprot_id="P04626",
@@ -130,7 +117,7 @@ def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> Anal
         ),
     ]
     pathways = [
-        PathwayScore(
+        PathwayScore.model_construct(
             pathway_id=f"R-{drug_name[:3]}-1",
             pathway_name="EGFR signaling",
             depth=3,
@@ -142,7 +129,7 @@ def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> Anal
             reactome_url="https://reactome.org/content/detail/R-HSA-177929",
             ancestor_pathway_ids=["R-HSA-162582"],
         ),
-        PathwayScore(
+        PathwayScore.model_construct(
             pathway_id=f"R-{drug_name[:3]}-2",
             pathway_name="PI3K/AKT signaling",
             depth=4,
@@ -155,21 +142,21 @@ def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> Anal
             ancestor_pathway_ids=["R-HSA-162582"],
         ),
     ]
-    graph = AssociationGraph(
+    graph = AssociationGraph.model_construct(
         nodes=[
-            GraphNode(id=f"drug:{canonical}", label=drug_name, kind="drug"),
-            GraphNode(id=f"target:{targets[0].target_chembl_id}", label=targets[0].target_name, kind="target"),
-            GraphNode(id=f"pathway:{pathways[0].pathway_id}", label=pathways[0].pathway_name, kind="pathway"),
+            GraphNode.model_construct(id=f"drug:{canonical}", label=drug_name, kind="drug"),
+            GraphNode.model_construct(id=f"target:{targets[0].target_chembl_id}", label=targets[0].target_name, kind="target"),
+            GraphNode.model_construct(id=f"pathway:{pathways[0].pathway_id}", label=pathways[0].pathway_name, kind="pathway"),
         ],
         edges=[
-            GraphEdge(
+            GraphEdge.model_construct(
                 id="e1",
                 source=f"drug:{canonical}",
                 target=f"target:{targets[0].target_chembl_id}",
                 kind="drug_target",
                 weight=8.9,
             ),
-            GraphEdge(
+            GraphEdge.model_construct(
                 id="e2",
                 source=f"target:{targets[0].target_chembl_id}",
                 target=f"pathway:{pathways[0].pathway_id}",
@@ -178,13 +165,13 @@ def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> Anal
             ),
         ],
     )
-    return AnalysisResult(
-        analysis_id=analysis_id,
-        created_at=datetime.now(timezone.utc),
+    return AnalysisResult.model_construct(
+        analysis_id="",
+        created_at=_FROZEN_NOW,
         drug_name=drug_name,
         canonical_drug_id=canonical,
         params=AnalysisParams(),
-        resolution=DrugResolution(
+        resolution=DrugResolution.model_construct(
             query=drug_name,
             display_name=drug_name.title(),
             chembl_parent_id=canonical,
@@ -197,37 +184,132 @@ def _analysis_payload(drug_name: str, degraded: list[str] | None = None) -> Anal
         pathways=pathways,
         graph=graph,
         source_versions={"chembl": "test"},
-        degraded_messages=degraded or [],
         attribution="Data sources: test",
     )
 
 
+_FROZEN_NOW = datetime.now(timezone.utc)
+_ANALYSIS_IDS = count()
+_UUID_RNG = Random(0)
+
+
+def _fake_uuid() -> str:
+    return str(UUID(int=_UUID_RNG.getrandbits(128), version=4))
+
+
+_ANALYSIS_TEMPLATE = _build_analysis_template("template")
+
+
+@lru_cache(maxsize=32)
+def _analysis_payload_core(drug_name: str, degraded: tuple[str, ...]) -> AnalysisResult:
+    # Shallow copies: unchanged leaves (assay IDs, URLs, params, ...) are shared with the template.
+    template = _ANALYSIS_TEMPLATE
+    prefix = drug_name[:3]
+    canonical = f"CHEMBL-{drug_name.upper()}"
+    targets = [
+        target.model_copy(update={"target_chembl_id": f"T-{prefix}-{index}"})
+        for index, target in enumerate(template.targets, start=1)
+    ]
+    first_pathway, second_pathway = template.pathways
+    pathways = [
+        first_pathway.model_copy(
+            update={"pathway_id": f"R-{prefix}-1", "target_ids": [target.target_chembl_id for target in targets]}
+        ),
+        second_pathway.model_copy(update={"pathway_id": f"R-{prefix}-2", "target_ids": [targets[1].target_chembl_id]}),
+    ]
+
+    drug_node, target_node, pathway_node = template.graph.nodes
+    drug_edge, pathway_edge = template.graph.edges
+    drug_node_id = f"drug:{canonical}"
+    target_node_id = f"target:{targets[0].target_chembl_id}"
+    pathway_node_id = f"pathway:{pathways[0].pathway_id}"
+    graph = template.graph.model_copy(
+        update={
+            "nodes": [
+                drug_node.model_copy(update={"id": drug_node_id, "label": drug_name}),
+                target_node.model_copy(update={"id": target_node_id}),
+                pathway_node.model_copy(update={"id": pathway_node_id}),
+            ],
+            "edges": [
+                drug_edge.model_copy(update={"source": drug_node_id, "target": target_node_id}),
+                pathway_edge.model_copy(update={"source": target_node_id, "target": pathway_node_id}),
+            ],
+        }
+    )
+    resolution = template.resolution.model_copy(
+        update={
+            "query": drug_name,
+            "display_name": drug_name.title(),
+            "chembl_parent_id": canonical,
+            "canonical_inchikey": f"{drug_name.upper()}-KEY",
+        }
+    )
+    return template.model_copy(
+        update={
+            "drug_name": drug_name,
+            "canonical_drug_id": canonical,
+            "resolution": resolution,
+            "targets": targets,
+            "pathways": pathways,
+            "graph": graph,
+            "degraded_messages": list(degraded),
+        }
+    )
+
+
+def _analysis_payload(drug_name: str, degraded: tuple[str, ...] = ()) -> AnalysisResult:
+    # Shallow copy: nested models are shared with the cached core and must not be mutated.
+    return _analysis_payload_core(drug_name, degraded).model_copy(
+        update={"analysis_id": f"test-analysis-{next(_ANALYSIS_IDS)}", "created_at": _FROZEN_NOW}
+    )
+
+
+_DEGRADED: Final[dict[str, tuple[str, ...]]] = {
+    "reactome_down": ("Pathway data temporarily unavailable. Showing target binding data only.",),
+    "opentargets_down": ("Drug mechanism data unavailable. Direction information may be missing.",),
+    "pubchem_down": ("Drug structure image unavailable.",),
+    "uniprot_down": ("Some target annotations may be incomplete.",),
+}
+
+_AMBIGUOUS_CANDIDATES = [
+    DrugResolutionCandidate.model_construct(
+        chembl_parent_id="CHEMBL-A",
+        display_name="Ambiguous A",
+        canonical_inchikey="A-KEY",
+        match_reasons=["chembl_parent_match"],
+    ),
+    DrugResolutionCandidate.model_construct(
+        chembl_parent_id="CHEMBL-B",
+        display_name="Ambiguous B",
+        canonical_inchikey="B-KEY",
+        match_reasons=["chembl_parent_match"],
+    ),
+]
+_AMBIGUOUS_RUN_CANDIDATES = _AMBIGUOUS_CANDIDATES[:1]
+
+_HEALTH_PAYLOAD = {
+    "status": "healthy",
+    "checks": {
+        "chembl": HealthResult(status="up", latency_ms=100),
+        "reactome": HealthResult(status="up", latency_ms=80),
+        "opentargets": HealthResult(status="up", latency_ms=90),
+        "pubchem": HealthResult(status="up", latency_ms=70),
+        "uniprot": HealthResult(status="up", latency_ms=110),
+    },
+}
+
+
 class StubAnalysisService(AnalysisService):
     def __init__(self) -> None:
         pass
 
     async def suggest(self, query: str) -> list[DrugSuggestItem]:
-        return [DrugSuggestItem(display_name="Erlotinib", chembl_id="CHEMBL553")]
+        return [DrugSuggestItem.model_construct(display_name="Erlotinib", chembl_id="CHEMBL553")]
 
     async def resolve_drug_identity(self, query: str, resolution_choice: str | None = None):
         if query == "ambiguous_drug" and not resolution_choice:
-            raise AmbiguousDrugError(
-                candidates=[
-                    DrugResolutionCandidate(
-                        chembl_parent_id="CHEMBL-A",
-                        display_name="Ambiguous A",
-                        canonical_inchikey="A-KEY",
-                        match_reasons=["chembl_parent_match"],
-                    ),
-                    DrugResolutionCandidate(
-                        chembl_parent_id="CHEMBL-B",
-                        display_name="Ambiguous B",
-                        canonical_inchikey="B-KEY",
-                        match_reasons=["chembl_parent_match"],
-                    ),
-                ]
-            )
-        resolution = DrugResolution(
+            raise AmbiguousDrugError(candidates=_AMBIGUOUS_CANDIDATES)
+        resolution = DrugResolution.model_construct(
             query=query,
             display_name=query.title(),
             chembl_parent_id=resolution_choice or "CHEMBL553",
@@ -240,89 +322,50 @@ class StubAnalysisService(AnalysisService):
         if drug_name == "chembl_down":
             raise FatalAnalysisError("ChEMBL is temporarily unavailable.")
         if drug_name == "ambiguous_drug" and not resolution_choice:
-            raise AmbiguousDrugError(
-                candidates=[
-                    DrugResolutionCandidate(
-                        chembl_parent_id="CHEMBL-A",
-                        display_name="Ambiguous A",
-                        canonical_inchikey="A-KEY",
-                        match_reasons=["chembl_parent_match"],
-                    )
-                ]
-            )
-        degraded = {
-            "reactome_down": ["Pathway data temporarily unavailable. Showing target binding data only."],
-            "opentargets_down": ["Drug mechanism data unavailable. Direction information may be missing."],
-            "pubchem_down": ["Drug structure image unavailable."],
-            "uniprot_down": ["Some target annotations may be incomplete."],
-        }.get(drug_name, [])
-        payload = _analysis_payload(drug_name=drug_name, degraded=degraded)
+            raise AmbiguousDrugError(candidates=_AMBIGUOUS_RUN_CANDIDATES)
+        payload = _analysis_payload(drug_name=drug_name, degraded=_DEGRADED.get(drug_name, ()))
         payload.params = params
         if resolution_choice:
             payload.canonical_drug_id = resolution_choice
-            payload.resolution.chembl_parent_id = resolution_choice
+            payload.resolution = payload.resolution.model_copy(update={"chembl_parent_id": resolution_choice})
         return payload
 
     async def health(self) -> dict:
-        from pathmind_api.clients.base import HealthResult
-
-        return {
-            "status": "healthy",
-            "checks": {
-                "chembl": HealthResult(status="up", latency_ms=100),
-                "reactome": HealthResult(status="up", latency_ms=80),
-                "opentargets": HealthResult(status="up", latency_ms=90),
-                "pubchem": HealthResult(status="up", latency_ms=70),
-                "uniprot": HealthResult(status="up", latency_ms=110),
-            },
-        }
+        return _HEALTH_PAYLOAD
 
 
 class StubJobService:
     def __init__(self) -> None:
-        self.jobs: dict[str, JobStatusResponse] = {}
+        self.jobs: dict[str, dict] = {}
 
     def create_job(self, *, job_type: str, request_payload: dict, version_snapshot: dict) -> str:
-        job_id = str(uuid4())
-        self.jobs[job_id] = JobStatusResponse(
-            job_id=job_id,
-            job_type=job_type,
-            status="queued",
-            progress=0.0,
-            created_at=datetime.now(timezone.utc),
-            version_snapshot=version_snapshot,
-        )
+        job_id = _fake_uuid()
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "job_type": job_type,
+            "status": "queued",
+            "progress": 0.0,
+            "created_at": _FROZEN_NOW,
+            "version_snapshot": version_snapshot,
+        }
         return job_id
 
     def get_status(self, job_id: str):
-        return self.jobs.get(job_id)
+        job = self.jobs.get(job_id)
+        return JobStatusResponse.model_construct(**job) if job is not None else None
 
     async def run_job(self, job_id: str, worker):
-        current = self.jobs[job_id]
-        self.jobs[job_id] = current.model_copy(update={"status": "running", "progress": 0.1, "started_at": datetime.now(timezone.utc)})
+        job = self.jobs[job_id]
+        job.update(status="running", progress=0.1, started_at=_FROZEN_NOW)
 
         def set_progress(value: float) -> None:
-            self.jobs[job_id] = self.jobs[job_id].model_copy(update={"progress": value})
+            job["progress"] = value
 
         try:
             result = await worker(set_progress)
-            self.jobs[job_id] = self.jobs[job_id].model_copy(
-                update={
-                    "status": "succeeded",
-                    "progress": 1.0,
-                    "finished_at": datetime.now(timezone.utc),
-                    "result": result,
-                }
-            )
+            job.update(status="succeeded", progress=1.0, finished_at=_FROZEN_NOW, result=result)
         except Exception as exc:
-            self.jobs[job_id] = self.jobs[job_id].model_copy(
-                update={
-                    "status": "failed",
-                    "progress": 1.0,
-                    "finished_at": datetime.now(timezone.utc),
-                    "error": str(exc),
-                }
-            )
+            job.update(status="failed", progress=1.0, finished_at=_FROZEN_NOW, error=str(exc))
 
 
 class StubPredictTargetsService:
@@ -489,176 +532,206 @@ class StubLincsProvider:
         )
 
 
+# Shared read-only snapshots; plain dicts because model_construct fields cannot serialize MappingProxyType.
+_VS_PHASE3_DATASETS: Final[dict[str, str]] = {"gtex": "test-v1", "hpa": "test-v1", "dilirank": "test-v1", "aopwiki": "test-v1"}
+_VS_GTEX_HPA: Final[dict[str, str]] = {"gtex": "test-v1", "hpa": "test-v1"}
+_VS_PATHWAY_EXPRESSION: Final[dict[str, str]] = {"gtex": "test-v1", "hpa": "test-v1", "reactome": "test-v1"}
+_VS_CHEMBL: Final[dict[str, str]] = {"chembl": "test-v1"}
+_VS_DILIRANK: Final[dict[str, str]] = {"dilirank": "test-v1"}
+_VS_TOXICITY: Final[dict[str, str]] = {"chembl": "test-v1", "dilirank": "test-v1"}
+_VS_AOPWIKI: Final[dict[str, str]] = {"aopwiki": "test-v1"}
+_VS_TISSUE_IMPACT: Final[dict[str, str]] = {"gtex": "test-v1", "hpa": "test-v1", "chembl": "test-v1"}
+_VS_PHASE4_DATASETS: Final[dict[str, str]] = {"pharmcat": "test-v1", "cpic": "test-v1", "hgnc": "test-v1", "progeny": "test-v1"}
+_VS_DRUG_RESPONSE: Final[dict[str, str]] = {"pharmcat": "test-v1", "cpic": "test-v1", "progeny": "test-v1"}
+
+# Shared, never-mutated phase 4 responses; per-patient copies only swap patient_id.
+_EMPTY_PGX: Final = PatientPgxResponse.model_construct(
+    patient_id="", gene_calls=[], drug_recommendations=[], version_snapshot={"pharmcat": "unknown", "cpic": "unknown"}
+)
+_EMPTY_PATHWAYS: Final = PatientPathwayActivityResponse.model_construct(
+    patient_id="", pathways=[], version_snapshot={"progeny": "unknown"}
+)
+_GUIDELINE_NOT_FOUND: Final = EvidenceRecord.model_construct(state="unknown", reason_code="guideline_not_found", provenance={})
+_PGX_ADJUST_EVIDENCE: Final = EvidenceRecord.model_construct(state="positive", reason_code="pgx_adjust_rule", provenance={"source": "stub"})
+_DRUG_RESPONSE_COMPONENTS: Final[dict[str, Any]] = {"pgx_state": "positive", "pathway_max_activity": 1.9}
+
+
 class StubPhase3DatasetService:
     def status(self, session) -> Phase3DatasetStatusResponse:
-        return Phase3DatasetStatusResponse(
+        return Phase3DatasetStatusResponse.model_construct(
             overall_status="ready",
             datasets=[
-                Phase3DatasetStatusItem(dataset="gtex", status="ready", version="test-v1"),
-                Phase3DatasetStatusItem(dataset="hpa", status="ready", version="test-v1"),
-                Phase3DatasetStatusItem(dataset="dilirank", status="ready", version="test-v1"),
-                Phase3DatasetStatusItem(dataset="aopwiki", status="ready", version="test-v1"),
+                Phase3DatasetStatusItem.model_construct(dataset="gtex", status="ready", version="test-v1"),
+                Phase3DatasetStatusItem.model_construct(dataset="hpa", status="ready", version="test-v1"),
+                Phase3DatasetStatusItem.model_construct(dataset="dilirank", status="ready", version="test-v1"),
+                Phase3DatasetStatusItem.model_construct(dataset="aopwiki", status="ready", version="test-v1"),
             ],
-            version_snapshot={"gtex": "test-v1", "hpa": "test-v1", "dilirank": "test-v1", "aopwiki": "test-v1"},
+            version_snapshot=_VS_PHASE3_DATASETS,
         )
 
 
 class StubTissueExpressionService:
     async def by_gene(self, session, gene: str) -> TissueExpressionResponse:
-        return TissueExpressionResponse(
+        return TissueExpressionResponse.model_construct(
             gene_symbol=gene.upper(),
             expression=[
-                TissueExpressionPoint(
+                TissueExpressionPoint.model_construct(
                     tissue="Liver",
                     gtex_tpm=25.0,
                     hpa_rna_nx=40.0,
                     hpa_protein_level="High",
-                    evidence=EvidenceRecord(state="positive", reason_code="measured_expression_present", provenance={}),
+                    evidence=EvidenceRecord.model_construct(state="positive", reason_code="measured_expression_present", provenance={}),
                 ),
-                TissueExpressionPoint(
+                TissueExpressionPoint.model_construct(
                     tissue="Brain",
                     gtex_tpm=0.2,
                     hpa_rna_nx=0.1,
                     hpa_protein_level="Low",
-                    evidence=EvidenceRecord(state="negative", reason_code="measured_expression_low", provenance={}),
+                    evidence=EvidenceRecord.model_construct(state="negative", reason_code="measured_expression_low", provenance={}),
                 ),
             ],
-            version_snapshot={"gtex": "test-v1", "hpa": "test-v1"},
+            version_snapshot=_VS_GTEX_HPA,
         )
 
     async def for_pathway(self, session, pathway_id: str) -> PathwayExpressionResponse:
-        return PathwayExpressionResponse(
+        return PathwayExpressionResponse.model_construct(
             pathway_id=pathway_id,
             pathway_name="EGFR signaling",
             genes=[],
-            version_snapshot={"gtex": "test-v1", "hpa": "test-v1", "reactome": "test-v1"},
+            version_snapshot=_VS_PATHWAY_EXPRESSION,
         )
 
 
 class StubHergService:
     async def evaluate(self, drug_id: str) -> HergResponse:
-        return HergResponse(
+        return HergResponse.model_construct(
             drug_id=drug_id,
             ic50_nM=120.0,
             assay_count=3,
             cmax_free_nM=None,
             safety_margin=None,
-            herg_signal=EvidenceRecord(state="positive", reason_code="ic50_threshold", provenance={}),
-            margin_signal=EvidenceRecord(state="unknown", reason_code="cmax_missing", provenance={}),
-            version_snapshot={"chembl": "test-v1"},
+            herg_signal=EvidenceRecord.model_construct(state="positive", reason_code="ic50_threshold", provenance={}),
+            margin_signal=EvidenceRecord.model_construct(state="unknown", reason_code="cmax_missing", provenance={}),
+            version_snapshot=_VS_CHEMBL,
         )
 
 
 class StubToxicityService:
     async def evaluate(self, session, drug_id: str) -> ToxicityResponse:
-        return ToxicityResponse(
+        return ToxicityResponse.model_construct(
             drug_id=drug_id,
             flags=[
-                ToxicityFlag(
+                ToxicityFlag.model_construct(
                     pathway_key="cyp_metabolism",
                     label="CYP metabolism",
                     risk_type="dili",
                     overlapping_genes=["CYP3A4"],
                     severity=0.25,
-                    signal=EvidenceRecord(state="positive", reason_code="mechanistic_overlap", provenance={}),
+                    signal=EvidenceRecord.model_construct(state="positive", reason_code="mechanistic_overlap", provenance={}),
                 )
             ],
             herg=await StubHergService().evaluate(drug_id),
-            dili=DiliResponse(
+            dili=DiliResponse.model_construct(
                 drug_name=drug_id,
                 category="Most-DILI-concern",
-                signal=EvidenceRecord(state="positive", reason_code="dilirank_concern", provenance={}),
-                version_snapshot={"dilirank": "test-v1"},
+                signal=EvidenceRecord.model_construct(state="positive", reason_code="dilirank_concern", provenance={}),
+                version_snapshot=_VS_DILIRANK,
             ),
-            toxcast=EvidenceRecord(state="unknown", reason_code="provider_disabled", provenance={}),
-            version_snapshot={"chembl": "test-v1", "dilirank": "test-v1"},
+            toxcast=EvidenceRecord.model_construct(state="unknown", reason_code="provider_disabled", provenance={}),
+            version_snapshot=_VS_TOXICITY,
         )
 
 
 class StubAopService:
     async def evaluate(self, session, drug_id: str) -> AopResponse:
-        return AopResponse(
+        return AopResponse.model_construct(
             drug_id=drug_id,
             matches=[
-                AopChainMatch(
+                AopChainMatch.model_construct(
                     aop_id="17",
                     mie="hERG blockade",
                     adverse_outcome="Sudden cardiac death",
                     key_events=["QT prolongation"],
                     matched_genes=["KCNH2"],
-                    signal=EvidenceRecord(state="positive", reason_code="aop_match_found", provenance={}),
+                    signal=EvidenceRecord.model_construct(state="positive", reason_code="aop_match_found", provenance={}),
                 )
             ],
-            signal=EvidenceRecord(state="positive", reason_code="aop_chain_match", provenance={}),
-            version_snapshot={"aopwiki": "test-v1"},
+            signal=EvidenceRecord.model_construct(state="positive", reason_code="aop_chain_match", provenance={}),
+            version_snapshot=_VS_AOPWIKI,
         )
 
 
 class StubTissueImpactService:
     async def evaluate(self, session, drug_id: str) -> TissueImpactResponse:
-        return TissueImpactResponse(
+        return TissueImpactResponse.model_construct(
             drug_id=drug_id,
             cells=[],
-            version_snapshot={"gtex": "test-v1", "hpa": "test-v1", "chembl": "test-v1"},
+            version_snapshot=_VS_TISSUE_IMPACT,
         )
 
 
 class StubPhase4DatasetService:
     def status(self, session) -> Phase4DatasetStatusResponse:
-        return Phase4DatasetStatusResponse(
+        return Phase4DatasetStatusResponse.model_construct(
             overall_status="ready",
             datasets=[
-                Phase4DatasetStatusItem(dataset="pharmcat", required=True, status="ready", version="test-v1"),
-                Phase4DatasetStatusItem(dataset="cpic", required=True, status="ready", version="test-v1"),
-                Phase4DatasetStatusItem(dataset="hgnc", required=True, status="ready", version="test-v1"),
-                Phase4DatasetStatusItem(dataset="progeny", required=True, status="ready", version="test-v1"),
-                Phase4DatasetStatusItem(dataset="pharmgkb", required=False, status="missing", reason="optional_not_loaded", version=None),
+                Phase4DatasetStatusItem.model_construct(dataset="pharmcat", required=True, status="ready", version="test-v1"),
+                Phase4DatasetStatusItem.model_construct(dataset="cpic", required=True, status="ready", version="test-v1"),
+                Phase4DatasetStatusItem.model_construct(dataset="hgnc", required=True, status="ready", version="test-v1"),
+                Phase4DatasetStatusItem.model_construct(dataset="progeny", required=True, status="ready", version="test-v1"),
+                Phase4DatasetStatusItem.model_construct(dataset="pharmgkb", required=False, status="missing", reason="optional_not_loaded", version=None),
             ],
-            version_snapshot={"pharmcat": "test-v1", "cpic": "test-v1", "hgnc": "test-v1", "progeny": "test-v1"},
+            version_snapshot=_VS_PHASE4_DATASETS,
         )
 
 
 class StubPatientProfileService:
-    def __init__(self, state: dict) -> None:
+    def __init__(self, state: dict[tuple, Any]) -> None:
         self.state = state
 
     def create(self, session, *, label: str, save_derived_default: bool = False) -> PatientProfileResponse:
-        patient_id = str(uuid4())
-        profile = PatientProfileResponse(
+        patient_id = _fake_uuid()
+        profile = PatientProfileResponse.model_construct(
             patient_id=patient_id,
             label=label,
             status="active",
             has_pgx=False,
             has_expression=False,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=_FROZEN_NOW,
+            updated_at=_FROZEN_NOW,
             version_snapshot={},
         )
-        self.state.setdefault("profiles", {})[patient_id] = profile
+        self.state[("profiles", patient_id)] = profile
         return profile
 
     def get(self, session, patient_id: str) -> PatientProfileResponse | None:
-        return self.state.get("profiles", {}).get(patient_id)
+        return self.state.get(("profiles", patient_id))
 
     def delete(self, session, patient_id: str) -> PatientDeleteResponse:
-        profiles = self.state.setdefault("profiles", {})
-        if patient_id in profiles:
-            profiles.pop(patient_id, None)
-            self.state.setdefault("pgx", {}).pop(patient_id, None)
-            self.state.setdefault("pathways", {}).pop(patient_id, None)
-            self.state.setdefault("drug_responses", {}).pop(patient_id, None)
+        if ("profiles", patient_id) in self.state:
+            for key in [key for key in self.state if key[1] == patient_id]:
+                del self.state[key]
             return PatientDeleteResponse(patient_id=patient_id, deleted=True)
         return PatientDeleteResponse(patient_id=patient_id, deleted=False)
 
 
+def _evidence_for(item) -> EvidenceRecord:
+    return EvidenceRecord.model_construct(
+        state=item.state,
+        reason_code=item.reason_code,
+        provenance=item.provenance,
+        confidence_note=item.confidence_note,
+    )
+
+
 class StubPgxService:
-    def __init__(self, state: dict) -> None:
+    def __init__(self, state: dict[tuple, Any]) -> None:
         self.state = state
 
     def process_vcf(self, vcf_path, version_snapshot: dict[str, str]) -> PgxProcessingResult:
-        return PgxProcessingResult(
+        return PgxProcessingResult.model_construct(
             gene_calls=[
-                PgxGeneCallParsed(
+                PgxGeneCallParsed.model_construct(
                     gene="CYP2D6",
                     diplotype="*1/*4",
                     phenotype="Intermediate Metabolizer",
@@ -669,7 +742,7 @@ class StubPgxService:
                 )
             ],
             drug_recommendations=[
-                PgxDrugRecommendationParsed(
+                PgxDrugRecommendationParsed.model_construct(
                     drug_id="CHEMBL553",
                     drug_name="erlotinib",
                     recommendation="adjust",
@@ -684,57 +757,45 @@ class StubPgxService:
         )
 
     def persist_patient_results(self, session, *, patient_id: str, result: PgxProcessingResult) -> None:
-        response = PatientPgxResponse(
+        response = PatientPgxResponse.model_construct(
             patient_id=patient_id,
             gene_calls=[
-                PatientPgxGeneCall(
+                PatientPgxGeneCall.model_construct(
                     gene=item.gene,
                     diplotype=item.diplotype,
                     phenotype=item.phenotype,
                     activity_score=item.activity_score,
-                    evidence=EvidenceRecord(
-                        state=item.state,
-                        reason_code=item.reason_code,
-                        provenance=item.provenance,
-                        confidence_note=item.confidence_note,
-                    ),
+                    evidence=_evidence_for(item),
                 )
                 for item in result.gene_calls
             ],
             drug_recommendations=[
-                PatientPgxDrugRecommendation(
+                PatientPgxDrugRecommendation.model_construct(
                     drug_id=item.drug_id,
                     drug_name=item.drug_name,
                     recommendation=item.recommendation,
                     evidence_level=item.evidence_level,
                     cpic_guideline_id=item.cpic_guideline_id,
-                    evidence=EvidenceRecord(
-                        state=item.state,
-                        reason_code=item.reason_code,
-                        provenance=item.provenance,
-                        confidence_note=item.confidence_note,
-                    ),
+                    evidence=_evidence_for(item),
                 )
                 for item in result.drug_recommendations
             ],
             version_snapshot=result.version_snapshot,
         )
-        self.state.setdefault("pgx", {})[patient_id] = response
-        profile = self.state.setdefault("profiles", {}).get(patient_id)
+        self.state[("pgx", patient_id)] = response
+        profile = self.state.get(("profiles", patient_id))
         if profile:
-            self.state["profiles"][patient_id] = profile.model_copy(update={"has_pgx": True})
+            profile.has_pgx = True
 
     def get_patient_pgx(self, session, patient_id: str) -> PatientPgxResponse:
-        return self.state.get("pgx", {}).get(
-            patient_id,
-            PatientPgxResponse(patient_id=patient_id, gene_calls=[], drug_recommendations=[], version_snapshot={"pharmcat": "unknown", "cpic": "unknown"}),
-        )
+        response = self.state.get(("pgx", patient_id))
+        return response if response is not None else _EMPTY_PGX.model_copy(update={"patient_id": patient_id})
 
     def get_patient_pgx_drug(self, session, *, patient_id: str, drug_id: str) -> PatientPgxDrugResponse:
         payload = self.get_patient_pgx(session, patient_id)
         for row in payload.drug_recommendations:
             if row.drug_id == drug_id or row.drug_name.lower() == drug_id.lower():
-                return PatientPgxDrugResponse(
+                return PatientPgxDrugResponse.model_construct(
                     patient_id=patient_id,
                     drug_id=drug_id,
                     drug_name=row.drug_name,
@@ -743,18 +804,18 @@ class StubPgxService:
                     evidence=row.evidence,
                     version_snapshot=payload.version_snapshot,
                 )
-        return PatientPgxDrugResponse(
+        return PatientPgxDrugResponse.model_construct(
             patient_id=patient_id,
             drug_id=drug_id,
             drug_name=drug_id,
             recommendation="insufficient_data",
-            evidence=EvidenceRecord(state="unknown", reason_code="guideline_not_found", provenance={}),
+            evidence=_GUIDELINE_NOT_FOUND,
             version_snapshot=payload.version_snapshot,
         )
 
 
 class StubPatientExpressionService:
-    def __init__(self, state: dict) -> None:
+    def __init__(self, state: dict[tuple, Any]) -> None:
         self.state = state
 
     async def process_expression(self, session, *, filename: str, content: bytes, version_snapshot: dict[str, str], keep_phase2_rows: bool):
@@ -791,115 +852,186 @@ class StubPatientExpressionService:
         return {"upload": upload, "enrichment": enrichment, "pathways": pathways}
 
     def persist_patient_expression(self, session, *, patient_id: str, filename: str, upload_summary: dict, pathways: list[dict], version_snapshot: dict[str, str]) -> str:
-        response = PatientPathwayActivityResponse(
+        response = PatientPathwayActivityResponse.model_construct(
             patient_id=patient_id,
             pathways=[
-                PatientPathwayActivityRow(
+                PatientPathwayActivityRow.model_construct(
                     pathway_id=row["pathway_id"],
                     pathway_name=row["pathway_name"],
                     activity_score=row["activity_score"],
                     p_value=row["p_value"],
                     percentile=row["percentile"],
                     method=row["method"],
-                    evidence=EvidenceRecord(state=row["state"], reason_code=row["reason_code"], provenance=row["provenance"]),
+                    evidence=EvidenceRecord.model_construct(
+                        state=row["state"], reason_code=row["reason_code"], provenance=row["provenance"]
+                    ),
                 )
                 for row in pathways
             ],
             version_snapshot=version_snapshot,
         )
-        self.state.setdefault("pathways", {})[patient_id] = response
-        profile = self.state.setdefault("profiles", {}).get(patient_id)
+        self.state[("pathways", patient_id)] = response
+        profile = self.state.get(("profiles", patient_id))
         if profile:
-            self.state["profiles"][patient_id] = profile.model_copy(update={"has_expression": True})
+            profile.has_expression = True
         return "run-phase4"
 
     def get_patient_pathway_activity(self, session, patient_id: str) -> PatientPathwayActivityResponse:
-        return self.state.get("pathways", {}).get(
-            patient_id,
-            PatientPathwayActivityResponse(patient_id=patient_id, pathways=[], version_snapshot={"progeny": "unknown"}),
-        )
+        response = self.state.get(("pathways", patient_id))
+        return response if response is not None else _EMPTY_PATHWAYS.model_copy(update={"patient_id": patient_id})
 
 
 class StubDrugResponseService:
-    def __init__(self, state: dict) -> None:
+    def __init__(self, state: dict[tuple, Any]) -> None:
         self.state = state
 
     def get_or_compute(self, session, *, patient_id: str, drug_id: str, drug_name: str | None = None) -> PatientDrugResponse:
-        cached = self.state.get("drug_responses", {}).get((patient_id, drug_id))
+        responses = self.state.setdefault(("drug_responses", patient_id), {})
+        cached = responses.get(drug_id)
         if cached:
             return cached
-        response = PatientDrugResponse(
+        response = PatientDrugResponse.model_construct(
             patient_id=patient_id,
             drug_id=drug_id,
             drug_name=drug_name or drug_id,
             recommendation="use_with_caution",
             confidence_level="moderate",
-            evidence=EvidenceRecord(state="positive", reason_code="pgx_adjust_rule", provenance={"source": "stub"}),
-            component_scores={"pgx_state": "positive", "pathway_max_activity": 1.9},
-            version_snapshot={"pharmcat": "test-v1", "cpic": "test-v1", "progeny": "test-v1"},
+            evidence=_PGX_ADJUST_EVIDENCE,
+            component_scores=_DRUG_RESPONSE_COMPONENTS,
+            version_snapshot=_VS_DRUG_RESPONSE,
         )
-        self.state.setdefault("drug_responses", {})[(patient_id, drug_id)] = response
+        responses[drug_id] = response
         return response
 
 
-@pytest.fixture()
-def client():
-    app = create_app()
+_STUB_SERVICE = StubAnalysisService()
+_CACHE = InMemoryCache()
+
+# Request sessions are discarded right after the response, so skip post-commit expiry reloads.
+_TestingSession = sessionmaker(autoflush=False, autocommit=False, expire_on_commit=False)
+# Unit tests keep their session across commits and must see fresh state, so they keep expiry on.
+_UnitSession = sessionmaker(autoflush=False, autocommit=False)
+
+
+@pytest.fixture(scope="session")
+def engine():
     engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
-    testing_session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    Base.metadata.create_all(bind=engine)
-    cache = InMemoryCache()
-    service = StubAnalysisService()
-    job_service = StubJobService()
-    predict_service = StubPredictTargetsService()
-    selectivity_service = StubSelectivityService()
-    ingest_service = StubExpressionIngestService()
-    enrichment_service = StubEnrichmentService()
-    tf_service = StubTfActivityService()
-    causal_service = StubCausalChainService()
-    lincs_provider = StubLincsProvider()
-    phase3_dataset_service = StubPhase3DatasetService()
-    tissue_expression_service = StubTissueExpressionService()
-    herg_service = StubHergService()
-    toxicity_service = StubToxicityService()
-    aop_service = StubAopService()
-    tissue_impact_service = StubTissueImpactService()
-    phase4_dataset_service = StubPhase4DatasetService()
-    phase4_state: dict = {"profiles": {}, "pgx": {}, "pathways": {}, "drug_responses": {}}
-    patient_profile_service = StubPatientProfileService(phase4_state)
-    pgx_service = StubPgxService(phase4_state)
-    patient_expression_service = StubPatientExpressionService(phase4_state)
-    drug_response_service = StubDrugResponseService(phase4_state)
+
+    # pysqlite manages BEGIN itself and breaks SAVEPOINT; take over transaction control.
+    # The database is throwaway, so journaling and syncs are skipped too.
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(bind=engine, checkfirst=False)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def cache() -> InMemoryCache:
+    return _CACHE
+
+
+@pytest.fixture(scope="session")
+def _job_service() -> StubJobService:
+    return StubJobService()
+
+
+@pytest.fixture(scope="session")
+def _phase4_state() -> dict:
+    # Flat store keyed by (kind, patient_id, ...) so deleting a patient is one scan.
+    return {}
+
+
+@pytest.fixture(autouse=True)
+def _reset_stub_state(_job_service, _phase4_state):
+    _CACHE.clear()
+    _job_service.jobs.clear()
+    _phase4_state.clear()
+
+
+def _provide(stub):
+    return lambda: stub
+
+
+@pytest.fixture(scope="session")
+def app(_job_service, _phase4_state):
+    app = _build_app()
+    stubs = {
+        "get_cache": _CACHE,
+        "get_analysis_service": _STUB_SERVICE,
+        "get_job_service": _job_service,
+        "get_predict_targets_service": StubPredictTargetsService(),
+        "get_selectivity_service": StubSelectivityService(),
+        "get_expression_ingest_service": StubExpressionIngestService(),
+        "get_enrichment_service": StubEnrichmentService(),
+        "get_tf_activity_service": StubTfActivityService(),
+        "get_causal_chain_service": StubCausalChainService(),
+        "get_lincs_provider": StubLincsProvider(),
+        "get_phase3_dataset_service": StubPhase3DatasetService(),
+        "get_tissue_expression_phase3_service": StubTissueExpressionService(),
+        "get_herg_phase3_service": StubHergService(),
+        "get_toxicity_phase3_service": StubToxicityService(),
+        "get_aop_phase3_service": StubAopService(),
+        "get_tissue_impact_phase3_service": StubTissueImpactService(),
+        "get_phase4_dataset_service": StubPhase4DatasetService(),
+        "get_patient_profile_phase4_service": StubPatientProfileService(_phase4_state),
+        "get_pgx_phase4_service": StubPgxService(_phase4_state),
+        "get_patient_expression_phase4_service": StubPatientExpressionService(_phase4_state),
+        "get_drug_response_phase4_service": StubDrugResponseService(_phase4_state),
+    }
 
     def override_db():
-        session = testing_session()
+        session = _TestingSession()
         try:
             yield session
         finally:
             session.close()
 
+    # The app is cached for the whole process, so the overrides are installed once and left in place.
     app.dependency_overrides[get_db] = override_db
-    app.dependency_overrides[get_cache] = lambda: cache
-    app.dependency_overrides[get_analysis_service] = lambda: service
-    app.dependency_overrides[get_job_service] = lambda: job_service
-    app.dependency_overrides[get_predict_targets_service] = lambda: predict_service
-    app.dependency_overrides[get_selectivity_service] = lambda: selectivity_service
-    app.dependency_overrides[get_expression_ingest_service] = lambda: ingest_service
-    app.dependency_overrides[get_enrichment_service] = lambda: enrichment_service
-    app.dependency_overrides[get_tf_activity_service] = lambda: tf_service
-    app.dependency_overrides[get_causal_chain_service] = lambda: causal_service
-    app.dependency_overrides[get_lincs_provider] = lambda: lincs_provider
-    app.dependency_overrides[get_phase3_dataset_service] = lambda: phase3_dataset_service
-    app.dependency_overrides[get_tissue_expression_phase3_service] = lambda: tissue_expression_service
-    app.dependency_overrides[get_herg_phase3_service] = lambda: herg_service
-    app.dependency_overrides[get_toxicity_phase3_service] = lambda: toxicity_service
-    app.dependency_overrides[get_aop_phase3_service] = lambda: aop_service
-    app.dependency_overrides[get_tissue_impact_phase3_service] = lambda: tissue_impact_service
-    app.dependency_overrides[get_phase4_dataset_service] = lambda: phase4_dataset_service
-    app.dependency_overrides[get_patient_profile_phase4_service] = lambda: patient_profile_service
-    app.dependency_overrides[get_pgx_phase4_service] = lambda: pgx_service
-    app.dependency_overrides[get_patient_expression_phase4_service] = lambda: patient_expression_service
-    app.dependency_overrides[get_drug_response_phase4_service] = lambda: drug_response_service
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides = {}
+    app.dependency_overrides.update({getattr(deps, name): _provide(stub) for name, stub in stubs.items()})
+    # Generate (and cache on app.openapi_schema) the contract up front so schema errors fail the session early.
+    assert "AnalysisResult" in app.openapi()["components"]["schemas"]
+    return app
+
+
+@pytest.fixture()
+def _reset_state(engine):
+    # Requests commit into SAVEPOINTs of one outer transaction that is rolled back after the test.
+    connection = engine.connect()
+    transaction = connection.begin()
+    _TestingSession.configure(bind=connection, join_transaction_mode="create_savepoint")
+    _UnitSession.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture()
+def session(_reset_state):
+    session = _UnitSession()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture()
+async def aclient(app, _reset_state):
+    # ASGITransport skips the app's startup/shutdown handlers on purpose: create_all targets the app engine that
+    # get_db is overridden away from, the phase-3 auto-seed would call AOP-Wiki, and shutdown closes real clients
+    # that the stubs replace.
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as async_client:
+        yield async_client
@@ -1,5 +1,14 @@
-def test_health(client):
-    response = client.get("/api/health")
+import orjson
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def _post(client, url: str, payload: dict):
+    return await client.post(url, content=orjson.dumps(payload), headers=_JSON_HEADERS)
+
+
+async def test_health(aclient):
+    response = await aclient.get("/api/health")
     assert response.status_code == 200
     payload = response.json()
     assert payload["status"] == "degraded"
@@ -7,8 +16,8 @@ def test_health(client):
     assert "etl_last_run" in payload
 
 
-def test_happy_path_erlotinib(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "erlotinib"})
+async def test_happy_path_erlotinib(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "erlotinib"})
     assert response.status_code == 200
     payload = response.json()
     assert payload["drug_name"] == "erlotinib"
@@ -18,92 +27,89 @@ def test_happy_path_erlotinib(client):
     assert "version_snapshot" in payload
 
 
-def test_fatal_chembl_down(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "chembl_down"})
+async def test_fatal_chembl_down(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "chembl_down"})
     assert response.status_code == 503
     assert "ChEMBL" in response.json()["detail"]
 
 
-def test_degraded_reactome_fallback(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "reactome_down"})
+async def test_degraded_reactome_fallback(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "reactome_down"})
     assert response.status_code == 200
     payload = response.json()
     assert "Pathway data temporarily unavailable. Showing target binding data only." in payload["degraded_messages"]
 
 
-def test_degraded_opentargets_fallback(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "opentargets_down"})
+async def test_degraded_opentargets_fallback(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "opentargets_down"})
     assert response.status_code == 200
     payload = response.json()
     assert "Drug mechanism data unavailable. Direction information may be missing." in payload["degraded_messages"]
 
 
-def test_degraded_pubchem_fallback(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "pubchem_down"})
+async def test_degraded_pubchem_fallback(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "pubchem_down"})
     assert response.status_code == 200
     payload = response.json()
     assert "Drug structure image unavailable." in payload["degraded_messages"]
 
 
-def test_degraded_uniprot_fallback(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "uniprot_down"})
+async def test_degraded_uniprot_fallback(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "uniprot_down"})
     assert response.status_code == 200
     payload = response.json()
     assert "Some target annotations may be incomplete." in payload["degraded_messages"]
 
 
-def test_share_snapshot_immutable(client):
-    created = client.post("/api/analysis/run", json={"drug_name": "erlotinib"}).json()
-    share = client.post(f"/api/analysis/{created['analysis_id']}/share", json={}).json()
-    shared_payload = client.get(f"/api/share/{share['share_id']}").json()
+async def test_share_snapshot_immutable(aclient):
+    created = (await _post(aclient, "/api/analysis/run", {"drug_name": "erlotinib"})).json()
+    share = (await _post(aclient, f"/api/analysis/{created['analysis_id']}/share", {})).json()
+    shared_payload = (await aclient.get(f"/api/share/{share['share_id']}")).json()
     assert shared_payload["analysis_id"] == created["analysis_id"]
     assert shared_payload["drug_name"] == "erlotinib"
 
 
-def test_do_not_log_still_fetchable_via_cache(client):
-    created = client.post("/api/analysis/run", json={"drug_name": "erlotinib", "do_not_log": True}).json()
-    read_back = client.get(f"/api/analysis/{created['analysis_id']}")
+async def test_do_not_log_still_fetchable_via_cache(aclient):
+    created = (await _post(aclient, "/api/analysis/run", {"drug_name": "erlotinib", "do_not_log": True})).json()
+    read_back = await aclient.get(f"/api/analysis/{created['analysis_id']}")
     assert read_back.status_code == 200
     assert read_back.json()["analysis_id"] == created["analysis_id"]
-    share_attempt = client.post(f"/api/analysis/{created['analysis_id']}/share", json={})
+    share_attempt = await _post(aclient, f"/api/analysis/{created['analysis_id']}/share", {})
     assert share_attempt.status_code == 404
 
 
-def test_drug_resolve_ambiguous_candidates(client):
-    response = client.post("/api/drugs/resolve", json={"query": "ambiguous_drug"})
+async def test_drug_resolve_ambiguous_candidates(aclient):
+    response = await _post(aclient, "/api/drugs/resolve", {"query": "ambiguous_drug"})
     assert response.status_code == 200
     payload = response.json()
     assert payload["status"] == "ambiguous"
     assert len(payload["candidates"]) >= 1
 
 
-def test_analysis_ambiguous_requires_choice(client):
-    response = client.post("/api/analysis/run", json={"drug_name": "ambiguous_drug"})
+async def test_analysis_ambiguous_requires_choice(aclient):
+    response = await _post(aclient, "/api/analysis/run", {"drug_name": "ambiguous_drug"})
     assert response.status_code == 409
     assert "candidates" in response.json()["detail"]
 
 
-def test_export_csv_and_json_have_metadata(client):
-    created = client.post("/api/analysis/run", json={"drug_name": "erlotinib"}).json()
+async def test_export_csv_and_json_have_metadata(aclient):
+    created = (await _post(aclient, "/api/analysis/run", {"drug_name": "erlotinib"})).json()
     analysis_id = created["analysis_id"]
 
-    csv_response = client.get(f"/api/analysis/{analysis_id}/export.csv")
+    csv_response = await aclient.get(f"/api/analysis/{analysis_id}/export.csv")
     assert csv_response.status_code == 200
-    assert "# analysis_id:" in csv_response.text
-    assert "pathway_id,pathway_name,score" in csv_response.text
+    assert b"# analysis_id:" in csv_response.content
+    assert b"pathway_id,pathway_name,score" in csv_response.content
 
-    json_response = client.get(f"/api/analysis/{analysis_id}/export.json")
+    json_response = await aclient.get(f"/api/analysis/{analysis_id}/export.json")
     assert json_response.status_code == 200
-    export_payload = json_response.json()
+    export_payload = orjson.loads(json_response.content)
     assert export_payload["metadata"]["analysis_id"] == analysis_id
     assert export_payload["analysis"]["analysis_id"] == analysis_id
 
 
-def test_compare_metrics(client):
-    response = client.post(
-        "/api/compare/run",
-        json={"drug_a": "erlotinib", "drug_b": "lapatinib"},
-    )
+async def test_compare_metrics(aclient):
+    response = await _post(aclient, "/api/compare/run", {"drug_a": "erlotinib", "drug_b": "lapatinib"})
     assert response.status_code == 200
     payload = response.json()
     assert "metrics" in payload
@@ -112,8 +118,8 @@ def test_compare_metrics(client):
     assert isinstance(payload["rows"], list)
 
 
-def test_openapi_includes_contract_fields(client):
-    response = client.get("/openapi.json")
+async def test_openapi_includes_contract_fields(aclient):
+    response = await aclient.get("/openapi.json")
     assert response.status_code == 200
     payload = response.json()
     assert "/api/analysis/{analysis_id}/export.csv" in payload["paths"]
@@ -1,12 +1,18 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from pathmind_api.database import Base
-from pathmind_api.models import DatasetCacheMeta, DiliRankEntry
-from pathmind_api.repositories import list_toxicity_pathway_gene_sets, upsert_tissue_expression_rows
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from pathmind_api.models import DatasetCacheMeta, DiliRankEntry, ToxicityPathwayGeneSet
+from pathmind_api.repositories import (
+    get_gene_identifiers_by_uniprots,
+    upsert_gene_identifier_maps,
+    upsert_tissue_expression_rows,
+)
 from pathmind_api.etl.phase3_ingest import refresh_toxicity_gene_sets
 from pathmind_api.services.dili_phase3 import DiliServicePhase3
 from pathmind_api.services.herg_phase3 import HergServicePhase3
@@ -15,15 +21,8 @@ from pathmind_api.services.tissue_impact_phase3 import TissueImpactServicePhase3
 from pathmind_api.services.toxcast_provider_phase3 import ConfiguredToxcastProvider, DisabledToxcastProvider
 
 
-def _session():
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
-    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    Base.metadata.create_all(bind=engine)
-    return Session()
-
-
-class DummyChemblHerg:
-    async def fetch_activities(self, drug_id: str):
+def _dummy_chembl_herg() -> SimpleNamespace:
+    async def fetch_activities(drug_id: str):
         if drug_id == "CHEMBL553":
             return [
                 {"target_chembl_id": "CHEMBL240", "pchembl_value": 7.0},
@@ -31,25 +30,28 @@ class DummyChemblHerg:
             ]
         return []
 
+    return SimpleNamespace(fetch_activities=fetch_activities)
 
-class DummyChemblImpact:
-    async def fetch_activities(self, drug_id: str):
+
+def _dummy_chembl_impact() -> SimpleNamespace:
+    async def fetch_activities(drug_id: str):
         return [{"target_chembl_id": "CHEMBL203", "pchembl_value": 8.0}]
 
-    async def fetch_target_details(self, target_ids):
+    async def fetch_target_details(target_ids):
         return {"CHEMBL203": {"gene_symbol": "EGFR"}}
 
+    return SimpleNamespace(fetch_activities=fetch_activities, fetch_target_details=fetch_target_details)
+
 
-def test_herg_cmax_missing_yields_unknown_margin():
-    service = HergServicePhase3(chembl=DummyChemblHerg(), cmax_free_lookup={})
-    result = __import__("asyncio").run(service.evaluate("CHEMBL553"))
+async def test_herg_cmax_missing_yields_unknown_margin():
+    service = HergServicePhase3(chembl=_dummy_chembl_herg(), cmax_free_lookup={})
+    result = await service.evaluate("CHEMBL553")
     assert result.herg_signal.state in {"positive", "negative"}
     assert result.margin_signal.state == "unknown"
     assert result.margin_signal.reason_code == "cmax_missing"
 
 
-def test_dili_mapping_states():
-    session = _session()
+def test_dili_mapping_states(session):
     session.add(
         DiliRankEntry(
             id="1",
@@ -67,8 +69,7 @@ def test_dili_mapping_states():
     assert unknown.signal.state == "unknown"
 
 
-def test_dataset_status_reports_missing_and_stale():
-    session = _session()
+def test_dataset_status_reports_missing_and_stale(session):
     stale_time = datetime.now(timezone.utc) - timedelta(days=500)
     session.add(
         DatasetCacheMeta(
@@ -87,8 +88,7 @@ def test_dataset_status_reports_missing_and_stale():
     assert by_name["hpa"].status == "missing"
 
 
-def test_tissue_expression_states():
-    session = _session()
+async def test_tissue_expression_states(session):
     upsert_tissue_expression_rows(
         session,
         [
@@ -105,34 +105,114 @@ def test_tissue_expression_states():
         ],
     )
     service = TissueExpressionServicePhase3()
-    response = __import__("asyncio").run(service.by_gene(session, "EGFR"))
+    response = await service.by_gene(session, "EGFR")
     assert response.expression[0].evidence.state in {"positive", "negative"}
 
 
-def test_tissue_impact_unknown_when_inputs_missing():
-    session = _session()
-    service = TissueImpactServicePhase3(chembl=DummyChemblImpact(), top_tissues=["Liver"])
-    result = __import__("asyncio").run(service.evaluate(session, "CHEMBL553"))
+async def test_pathway_gene_caching_is_bounded(session):
+    in_flight = 0
+    peak = 0
+    resolved: list[str] = []
+
+    async def resolve_gene(gene_symbol: str):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        resolved.append(gene_symbol)
+        return None
+
+    service = TissueExpressionServicePhase3(gtex_client=SimpleNamespace(resolve_gene=resolve_gene), max_concurrent_genes=4)
+    genes = [f"GENE{index}" for index in range(30)]
+    await service._ensure_genes_cached(session, genes)
+    assert sorted(resolved) == sorted(genes)
+    assert peak == 4
+
+
+@pytest.mark.parametrize(
+    "error",
+    [OperationalError("INSERT INTO tissue_expression", {}, Exception("database is locked")), httpx.ConnectError("refused")],
+)
+async def test_pathway_gene_caching_survives_one_gene_failing(session, monkeypatch, error):
+    cached: list[str] = []
+
+    async def ensure_gene_cached(session, gene_symbol: str) -> None:
+        if gene_symbol == "BROKEN":
+            raise error
+        cached.append(gene_symbol)
+
+    service = TissueExpressionServicePhase3()
+    monkeypatch.setattr(service, "_ensure_gene_cached", ensure_gene_cached)
+    await service._ensure_genes_cached(session, ["EGFR", "BROKEN", "KRAS"])
+    assert sorted(cached) == ["EGFR", "KRAS"]
+    assert session.scalar(select(1)) == 1
+
+
+async def test_pathway_gene_caching_does_not_swallow_programming_errors(session, monkeypatch):
+    async def ensure_gene_cached(session, gene_symbol: str) -> None:
+        if gene_symbol == "BROKEN":
+            raise NameError("name 'by_symbol' is not defined")
+
+    service = TissueExpressionServicePhase3()
+    monkeypatch.setattr(service, "_ensure_gene_cached", ensure_gene_cached)
+    with pytest.raises(NameError):
+        await service._ensure_genes_cached(session, ["EGFR", "BROKEN", "KRAS"])
+
+
+def test_gene_identifiers_by_uniprot_pick_first_symbol_for_shared_ids(session):
+    upsert_gene_identifier_maps(
+        session,
+        [
+            {"gene_symbol": "HLA-B", "uniprot_id": "P01889", "aliases": []},
+            {"gene_symbol": "HLA-A", "uniprot_id": "P01889", "aliases": []},
+            {"gene_symbol": "EGFR", "uniprot_id": "P00533", "aliases": []},
+        ],
+    )
+    mapped = get_gene_identifiers_by_uniprots(session, ["P01889", "P00533", "Q99999", ""])
+    assert {uniprot_id: row.gene_symbol for uniprot_id, row in mapped.items()} == {"P01889": "HLA-A", "P00533": "EGFR"}
+
+
+def test_upsert_gene_identifier_maps_counts_inserts_and_updates(session):
+    assert upsert_gene_identifier_maps(session, [{"gene_symbol": "egfr", "uniprot_id": "P00533", "aliases": ["erbb1"]}]) == 1
+    upserted = upsert_gene_identifier_maps(
+        session,
+        [
+            {"gene_symbol": "EGFR", "uniprot_id": "STALE", "ensembl_id": None, "aliases": []},
+            {"gene_symbol": "KRAS", "uniprot_id": "P01116", "ensembl_id": "ENSG00000133703", "aliases": []},
+            {"gene_symbol": "egfr ", "uniprot_id": "P00533", "ensembl_id": "ENSG00000146648", "aliases": [" her1 ", ""]},
+        ],
+    )
+    assert upserted == 2
+    mapped = get_gene_identifiers_by_uniprots(session, ["P00533", "P01116", "STALE"])
+    assert sorted(mapped) == ["P00533", "P01116"]
+    assert mapped["P00533"].gene_symbol == "EGFR"
+    assert mapped["P00533"].ensembl_id == "ENSG00000146648"
+    assert mapped["P00533"].aliases == ["HER1"]
+    assert mapped["P01116"].gene_symbol == "KRAS"
+
+
+async def test_tissue_impact_unknown_when_inputs_missing(session):
+    service = TissueImpactServicePhase3(chembl=_dummy_chembl_impact(), top_tissues=["Liver"])
+    result = await service.evaluate(session, "CHEMBL553")
     assert result.cells[0].signal.state == "unknown"
 
 
-def test_toxcast_disabled_provider_unknown():
+async def test_toxcast_disabled_provider_unknown():
     provider = DisabledToxcastProvider()
-    result = __import__("asyncio").run(provider.summary_signal("CHEMBL553"))
+    result = await provider.summary_signal("CHEMBL553")
     assert result.state == "unknown"
     assert result.reason_code == "provider_disabled"
 
 
-def test_toxcast_configured_missing_key_unknown():
+async def test_toxcast_configured_missing_key_unknown():
     provider = ConfiguredToxcastProvider(provider_name="epa", api_key=None)
-    result = __import__("asyncio").run(provider.summary_signal("CHEMBL553"))
+    result = await provider.summary_signal("CHEMBL553")
     assert result.state == "unknown"
     assert result.reason_code == "provider_missing_api_key"
 
 
-def test_phase3_default_toxicity_gene_sets_count(tmp_path):
-    session = _session()
+def test_phase3_default_toxicity_gene_sets_count(tmp_path, session):
     sync_result = refresh_toxicity_gene_sets(session, data_dir=str(tmp_path))
-    rows = list_toxicity_pathway_gene_sets(session)
     assert sync_result.rows_upserted >= 10
-    assert len(rows) >= 10
+    assert session.scalar(select(func.count()).select_from(ToxicityPathwayGeneSet)) >= 10
@@ -1,14 +1,14 @@
+import asyncio
+import os
+import sys
+from bisect import bisect_right
 from pathlib import Path
-from tempfile import TemporaryDirectory
+from types import SimpleNamespace
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
 from pathmind_api.config import Settings
-from pathmind_api.database import Base
 from pathmind_api.repositories import (
     add_patient_pathway_activity_rows,
     add_patient_pgx_drug_recommendations,
@@ -22,63 +22,104 @@ from pathmind_api.services.drug_response_phase4 import DrugResponseServicePhase4
 from pathmind_api.services.patient_expression_phase4 import _row_state
 from pathmind_api.services.pgx_phase4 import PgxServicePhase4, _classify_gene_state, _normalize_phenotype
 from pathmind_api.services.phase4_dataset_service import Phase4DatasetService
-from pathmind_api.services.pharmcat_runner_phase4 import PharmcatRunnerPhase4
-
-
-def _session():
-    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
-    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    Base.metadata.create_all(bind=engine)
-    return Session()
-
-
-class DummyRunner:
-    def __init__(self, rows: list[PgxGeneCallParsed]) -> None:
-        self.rows = rows
-
-    def run_from_vcf(self, vcf_path: Path):
-        return self.rows
-
-
-def test_pgx_tri_state_mapping_and_recommendation():
-    with TemporaryDirectory() as tmp_dir:
-        cpic = Path(tmp_dir) / "cpic_recommendations.csv"
-        cpic.write_text(
-            "gene,phenotype,drug_id,drug_name,recommendation,evidence_level,cpic_guideline_id\n"
-            "CYP2D6,Intermediate Metabolizer,CHEMBL553,Erlotinib,Adjust dose,1A,CPIC-1\n",
-            encoding="utf-8",
-        )
-        runner = DummyRunner(
-            [
-                PgxGeneCallParsed(
-                    gene="CYP2D6",
-                    diplotype="*1/*4",
-                    phenotype="Intermediate Metabolizer",
-                    activity_score=1.0,
-                    state="unknown",
-                    reason_code="parsed",
-                )
-            ]
-        )
-        service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
-        result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "v1"})
-        assert result.gene_calls[0].state == "positive"
-        assert result.gene_calls[0].reason_code == "phenotype_intermediate_caution"
-        assert result.drug_recommendations[0].recommendation == "adjust"
-        assert result.drug_recommendations[0].state == "positive"
-
-
-def test_pgx_unknown_when_guideline_missing():
-    with TemporaryDirectory() as tmp_dir:
-        runner = DummyRunner([PgxGeneCallParsed(gene="CYP2D6", state="unknown", reason_code="gene_not_called")])
-        service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
-        result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "unknown"})
-        assert result.drug_recommendations[0].state == "unknown"
-        assert result.drug_recommendations[0].reason_code == "guideline_not_found"
-
-
-def test_drug_response_prefers_pgx_contraindication():
-    session = _session()
+from pathmind_api.services.pharmcat_runner_phase4 import PharmcatRunnerPhase4, _find_info_value, _parse_inline_call
+
+
+@pytest.fixture(scope="module")
+def _phase4_root(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("phase4")
+
+
+@pytest.fixture
+def tmp_dir(_phase4_root, request) -> str:
+    # One directory per module; each test gets its own subdirectory inside it.
+    path = _phase4_root / request.node.name
+    path.mkdir()
+    return str(path)
+
+
+def _dummy_runner(rows: list[PgxGeneCallParsed]) -> SimpleNamespace:
+    return SimpleNamespace(run_from_vcf=lambda vcf_path: rows)
+
+
+def test_pgx_tri_state_mapping_and_recommendation(tmp_dir):
+    cpic = Path(tmp_dir) / "cpic_recommendations.csv"
+    cpic.write_text(
+        "gene,phenotype,drug_id,drug_name,recommendation,evidence_level,cpic_guideline_id\n"
+        "CYP2D6,Intermediate Metabolizer,CHEMBL553,Erlotinib,Adjust dose,1A,CPIC-1\n",
+        encoding="utf-8",
+    )
+    runner = _dummy_runner(
+        [
+            PgxGeneCallParsed(
+                gene="CYP2D6",
+                diplotype="*1/*4",
+                phenotype="Intermediate Metabolizer",
+                activity_score=1.0,
+                state="unknown",
+                reason_code="parsed",
+            )
+        ]
+    )
+    service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
+    result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "v1"})
+    assert result.gene_calls[0].state == "positive"
+    assert result.gene_calls[0].reason_code == "phenotype_intermediate_caution"
+    assert result.drug_recommendations[0].recommendation == "adjust"
+    assert result.drug_recommendations[0].state == "positive"
+
+
+def test_pgx_unknown_when_guideline_missing(tmp_dir):
+    runner = _dummy_runner([PgxGeneCallParsed(gene="CYP2D6", state="unknown", reason_code="gene_not_called")])
+    service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
+    result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "unknown"})
+    assert result.drug_recommendations[0].state == "unknown"
+    assert result.drug_recommendations[0].reason_code == "guideline_not_found"
+
+
+def test_pgx_uncalled_gene_matches_every_rule_for_gene(tmp_dir):
+    cpic = Path(tmp_dir) / "cpic_recommendations.csv"
+    cpic.write_text(
+        "gene,phenotype,drug_id,drug_name,recommendation,evidence_level,cpic_guideline_id\n"
+        "CYP2D6,Poor Metabolizer,CHEMBL1,Codeine,Avoid codeine,1A,CPIC-1\n"
+        "CYP2D6,Normal Metabolizer,CHEMBL2,Tramadol,Standard dosing,1A,CPIC-2\n"
+        "CYP2C19,Poor Metabolizer,CHEMBL3,Clopidogrel,Use alternative,1A,CPIC-3\n",
+        encoding="utf-8",
+    )
+    # A gene seen only through a GENE= INFO tag has no phenotype, so every rule for that gene applies.
+    runner = _dummy_runner([PgxGeneCallParsed(gene="CYP2D6", state="unknown", reason_code="gene_not_called")])
+    service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
+    result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "v1"})
+    assert result.gene_calls[0].reason_code == "gene_not_called"
+    assert [item.drug_id for item in result.drug_recommendations] == ["CHEMBL1", "CHEMBL2"]
+
+
+def test_pgx_rules_keep_cpic_file_order_across_wildcard_and_exact_rows(tmp_dir):
+    cpic = Path(tmp_dir) / "cpic_recommendations.csv"
+    cpic.write_text(
+        "gene,phenotype,drug_id,drug_name,recommendation,evidence_level,cpic_guideline_id\n"
+        "CYP2D6,,CHEMBL1,Codeine,Use alternative,1A,CPIC-1\n"
+        "CYP2D6,Poor Metabolizer,CHEMBL1,Codeine,Avoid codeine,1A,CPIC-2\n"
+        "CYP2D6,Normal Metabolizer,CHEMBL1,Codeine,Standard dosing,1A,CPIC-3\n"
+        "CYP2D6,,CHEMBL2,Tramadol,Standard dosing,1A,CPIC-4\n"
+        "CYP2D6,*,CHEMBL3,Eliglustat,Adjust dose,1A,CPIC-5\n",
+        encoding="utf-8",
+    )
+    runner = _dummy_runner(
+        [
+            PgxGeneCallParsed(gene="CYP2D6", phenotype="Poor Metabolizer", state="unknown", reason_code="parsed"),
+            PgxGeneCallParsed(gene="CYP2D6", state="unknown", reason_code="gene_not_called"),
+        ]
+    )
+    service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
+    result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "v1"})
+    guidelines = [item.cpic_guideline_id for item in result.drug_recommendations]
+    # Exact and wildcard rows interleave in file order; without a phenotype every CYP2D6 row applies.
+    # A literal "*" phenotype is just another phenotype, not a wildcard.
+    assert guidelines == ["CPIC-1", "CPIC-2", "CPIC-4", "CPIC-1", "CPIC-2", "CPIC-3", "CPIC-4", "CPIC-5"]
+
+
+def test_drug_response_prefers_pgx_contraindication(session):
     profile = create_patient_profile(session, label="Patient-A")
     add_patient_pgx_drug_recommendations(
         session,
@@ -103,8 +144,7 @@ def test_drug_response_prefers_pgx_contraindication():
     assert result.confidence_level == "high"
 
 
-def test_phase4_dataset_status_required_and_optional():
-    session = _session()
+def test_phase4_dataset_status_required_and_optional(session):
     upsert_dataset_cache_meta(
         session,
         dataset_key="pharmcat",
@@ -127,12 +167,11 @@ def test_phase4_upload_size_guard():
         _store_temp_upload(settings, filename="large.vcf", content=payload, prefix="vcf")
 
 
-def test_phase4_temp_file_written_without_raw_payload_in_name():
-    with TemporaryDirectory() as tmp_dir:
-        settings = Settings(phase4_data_dir=tmp_dir, phase4_max_upload_mb=5)
-        path = _store_temp_upload(settings, filename="sample.vcf", content=b"abc", prefix="vcf")
-        assert path.exists()
-        assert "abc" not in path.name
+def test_phase4_temp_file_written_without_raw_payload_in_name(tmp_dir):
+    settings = Settings(phase4_data_dir=tmp_dir, phase4_max_upload_mb=5)
+    path = _store_temp_upload(settings, filename="sample.vcf", content=b"abc", prefix="vcf")
+    assert path.exists()
+    assert "abc" not in path.name
 
 
 # --- Step 1 tests: phenotype matching ---
@@ -153,31 +192,30 @@ def test_pgx_intermediate_metabolizer_is_positive():
     assert reason == "phenotype_intermediate_caution"
 
 
-def test_pgx_phenotype_matching_no_false_positives():
+def test_pgx_phenotype_matching_no_false_positives(tmp_dir):
     """'Normal Metabolizer' must NOT match 'Abnormal Function' after normalization."""
-    with TemporaryDirectory() as tmp_dir:
-        cpic = Path(tmp_dir) / "cpic_recommendations.csv"
-        cpic.write_text(
-            "gene,phenotype,drug_id,drug_name,recommendation,evidence_level,cpic_guideline_id\n"
-            "CYP2D6,Normal Metabolizer,CHEMBL25,Aspirin,Standard dosing,1A,CPIC-2\n",
-            encoding="utf-8",
-        )
-        runner = DummyRunner(
-            [
-                PgxGeneCallParsed(
-                    gene="CYP2D6",
-                    phenotype="Abnormal Function",
-                    state="unknown",
-                    reason_code="parsed",
-                )
-            ]
-        )
-        service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
-        result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "v1"})
-        # "Abnormal Function" must not match the "Normal Metabolizer" CPIC rule
-        # So only the fallback insufficient_data recommendation should appear
-        assert result.drug_recommendations[0].recommendation == "insufficient_data"
-        assert result.drug_recommendations[0].reason_code == "guideline_not_found"
+    cpic = Path(tmp_dir) / "cpic_recommendations.csv"
+    cpic.write_text(
+        "gene,phenotype,drug_id,drug_name,recommendation,evidence_level,cpic_guideline_id\n"
+        "CYP2D6,Normal Metabolizer,CHEMBL25,Aspirin,Standard dosing,1A,CPIC-2\n",
+        encoding="utf-8",
+    )
+    runner = _dummy_runner(
+        [
+            PgxGeneCallParsed(
+                gene="CYP2D6",
+                phenotype="Abnormal Function",
+                state="unknown",
+                reason_code="parsed",
+            )
+        ]
+    )
+    service = PgxServicePhase4(phase4_data_dir=tmp_dir, runner=runner)  # type: ignore[arg-type]
+    result = service.process_vcf(Path(tmp_dir) / "fake.vcf", version_snapshot={"cpic": "v1"})
+    # "Abnormal Function" must not match the "Normal Metabolizer" CPIC rule
+    # So only the fallback insufficient_data recommendation should appear
+    assert result.drug_recommendations[0].recommendation == "insufficient_data"
+    assert result.drug_recommendations[0].reason_code == "guideline_not_found"
 
 
 def test_normalize_phenotype_exact_cases():
@@ -206,7 +244,7 @@ def test_expression_percentile_actual_ranks():
     sorted_scores = sorted(scores)
     for item in pathways:
         score = item["activity_score"]
-        rank = sum(1 for s in sorted_scores if s <= score)
+        rank = bisect_right(sorted_scores, score)
         item["percentile"] = round(100.0 * rank / len(sorted_scores), 1)
 
     percentiles = [item["percentile"] for item in pathways]
@@ -241,9 +279,8 @@ def test_expression_state_uses_significance():
 # --- Step 5 tests: drug-pathway relevance ---
 
 
-def test_drug_response_no_pathway_override_without_significance():
+def test_drug_response_no_pathway_override_without_significance(session):
     """Pathways without statistical significance should NOT trigger override."""
-    session = _session()
     profile = create_patient_profile(session, label="Patient-Sig")
     add_patient_pgx_drug_recommendations(
         session,
@@ -302,15 +339,213 @@ def test_drug_response_no_pathway_override_without_significance():
 # --- Step 6 test: pharmcat empty VCF ---
 
 
-def test_pharmcat_empty_vcf_returns_empty():
+def test_pharmcat_empty_vcf_returns_empty(tmp_dir):
     """When VCF has no parseable pharmacogene data, return empty list (no dummy CYP2D6)."""
-    with TemporaryDirectory() as tmp_dir:
-        vcf = Path(tmp_dir) / "empty.vcf"
-        vcf.write_text(
-            "##fileformat=VCFv4.2\n"
-            "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n",
-            encoding="utf-8",
-        )
-        runner = PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)
-        calls = runner._fallback_parse_vcf(vcf)
-        assert calls == []
+    vcf = Path(tmp_dir) / "empty.vcf"
+    vcf.write_text(
+        "##fileformat=VCFv4.2\n"
+        "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n",
+        encoding="utf-8",
+    )
+    runner = PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)
+    calls = runner._fallback_parse_vcf(vcf)
+    assert calls == []
+
+
+def _write_vcf(tmp_dir: str, *lines: str, newline: str = "\n") -> Path:
+    vcf = Path(tmp_dir) / "sample.vcf"
+    vcf.write_bytes(newline.join(("##fileformat=VCFv4.2", *lines, "")).encode("utf-8"))
+    return vcf
+
+
+def _data_line(info: str, *extra: str) -> str:
+    return "\t".join(("chr22", "42126611", "rs1065852", "C", "T", ".", "PASS", info, *extra))
+
+
+@pytest.mark.parametrize(
+    ("info", "expected"),
+    [
+        ("GENE=cyp2d6;DP=3", ["CYP2D6"]),
+        ("DP=3;GENE=cyp2c19;AF=0.5", ["CYP2C19"]),
+        ("DP=3;GENE=slco1b1", ["SLCO1B1"]),
+        ("XGENE=CYP2D6;DP=3", []),
+        ("DP=3;XGENE=CYP2D6", []),
+        ("DP=3;GENE=", []),
+    ],
+)
+def test_pharmcat_fallback_reads_gene_info_tag(tmp_dir, info, expected):
+    vcf = _write_vcf(tmp_dir, _data_line(info))
+    calls = PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)._fallback_parse_vcf(vcf)
+    assert [call.gene for call in calls] == expected
+    assert all(call.reason_code == "gene_not_called" for call in calls)
+
+
+def test_pharmcat_fallback_handles_crlf_and_surrounding_whitespace(tmp_dir):
+    vcf = _write_vcf(tmp_dir, _data_line("DP=3;GENE=cyp2d6"), "  " + _data_line("GENE=cyp2c9") + "  ", newline="\r\n")
+    calls = PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)._fallback_parse_vcf(vcf)
+    assert [call.gene for call in calls] == ["CYP2C9", "CYP2D6"]
+
+
+def test_pharmcat_fallback_reads_info_column_only(tmp_dir):
+    vcf = _write_vcf(
+        tmp_dir,
+        # 7 columns: no INFO, ignored.
+        "\t".join(("chr22", "1", ".", "C", "T", ".", "GENE=BOGUS")),
+        # 8 columns: INFO is the last field.
+        _data_line("GENE=CYP2D6"),
+        # 9+ columns: FORMAT/sample values that look like tags are not INFO.
+        _data_line("DP=3", "GT:GENE=FAKE", "0/1;GENE=FAKE2"),
+        _data_line("GENE=CYP2C19", "GT", "0/1"),
+    )
+    calls = PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)._fallback_parse_vcf(vcf)
+    assert [call.gene for call in calls] == ["CYP2C19", "CYP2D6"]
+
+
+def test_pharmcat_fallback_inline_call_overrides_info_tag(tmp_dir):
+    vcf = _write_vcf(
+        tmp_dir,
+        "##PATHMIND_GENE_CALL=CYP2D6|*1/*4|Intermediate Metabolizer|1.0",
+        "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO",
+        _data_line("GENE=CYP2D6"),
+        _data_line("GENE=CYP2C19"),
+    )
+    calls = {call.gene: call for call in PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)._fallback_parse_vcf(vcf)}
+    assert calls["CYP2D6"].phenotype == "Intermediate Metabolizer"
+    assert calls["CYP2D6"].reason_code == "parsed_from_vcf_annotation"
+    assert calls["CYP2C19"].reason_code == "gene_not_called"
+
+
+def test_pharmcat_fallback_skips_header_lines_that_look_like_records(tmp_dir):
+    vcf = _write_vcf(
+        tmp_dir,
+        "\t".join(("##INFO=<ID=GENE,Number=1,Type=String>", "1", ".", "C", "T", ".", "PASS", "GENE=META")),
+        "##PATHMIND_GENE_CALL=HLA-B|*57:01/*01:01|Positive",
+        "\t".join(("#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "GENE=CHROMHEADER")),
+        "",
+        _data_line("GENE=CYP2C9"),
+    )
+    calls = PharmcatRunnerPhase4(phase4_data_dir=tmp_dir)._fallback_parse_vcf(vcf)
+    assert [(call.gene, call.reason_code) for call in calls] == [
+        ("CYP2C9", "gene_not_called"),
+        ("HLA-B", "parsed_from_vcf_annotation"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("info", "expected"),
+    [
+        (b"GENE=CYP2D6;DP=3", b"CYP2D6"),
+        (b"DP=3;AF=0.5;GENE=CYP2C19", b"CYP2C19"),
+        (b"DP=3;AF=0.5", None),
+        (b"XGENE=CYP2D6;DP=3", None),
+        (b"DP=3;XGENE=CYP2D6;GENE=SLCO1B1", b"SLCO1B1"),
+        (b"DP=3;GENE=;AF=0.5", b""),
+        (b"GENE", None),
+    ],
+)
+def test_find_info_value(info, expected):
+    assert _find_info_value(info, b"GENE") == expected
+
+
+def test_parse_inline_call_returns_independent_models():
+    first = _parse_inline_call("CYP2D6|*1/*4|Poor Metabolizer|0")
+    first.provenance["source"] = "mutated"
+    first.phenotype = "mutated"
+    second = _parse_inline_call("CYP2D6|*1/*4|Poor Metabolizer|0")
+    assert second is not first
+    assert second.provenance == {"source": "vcf_annotation_pipe"}
+    assert second.phenotype == "Poor Metabolizer"
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    [
+        (
+            '{"gene": "cyp2c19", "diplotype": "*2/*2", "phenotype": "Poor Metabolizer", "activity_score": "0"}',
+            ("CYP2C19", "*2/*2", "Poor Metabolizer", 0.0, "vcf_annotation_json"),
+        ),
+        ("CYP2D6|*1/*4|Poor Metabolizer|0.0", ("CYP2D6", "*1/*4", "Poor Metabolizer", 0.0, "vcf_annotation_pipe")),
+        ("HLA-B|*57:01/*01:01|Positive", ("HLA-B", "*57:01/*01:01", "Positive", None, "vcf_annotation_pipe")),
+        (" cyp2c9 ", ("CYP2C9", None, None, None, "vcf_annotation_pipe")),
+        ("2D6|*1/*4|Poor Metabolizer", None),
+        ("*1/*4|Poor Metabolizer", None),
+        ("   ", None),
+        ('{"phenotype": "Poor Metabolizer"}', None),
+    ],
+)
+def test_parse_inline_call(payload, expected):
+    call = _parse_inline_call(payload)
+    if expected is None:
+        assert call is None
+        return
+    assert (call.gene, call.diplotype, call.phenotype, call.activity_score, call.provenance["source"]) == expected
+    assert call.reason_code == "parsed_from_vcf_annotation"
+
+
+def _fake_java(tmp_dir: str, body: str) -> PharmcatRunnerPhase4:
+    """Runner whose java_bin is a Python script standing in for PharmCAT; `out` is the -o directory."""
+    script = Path(tmp_dir) / "fake-java"
+    script.write_text(
+        f"#!{sys.executable}\nimport os, sys, time\nout = sys.argv[sys.argv.index('-o') + 1]\n{body}\n",
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    jar = Path(tmp_dir) / "pharmcat.jar"
+    jar.write_bytes(b"")
+    return PharmcatRunnerPhase4(phase4_data_dir=tmp_dir, java_bin=str(script), pharmcat_jar_path=str(jar))
+
+
+def _process_gone(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    return False
+
+
+async def _wait_for_pid(pid_file: Path) -> int:
+    for _ in range(500):
+        if pid_file.exists() and pid_file.read_text(encoding="utf-8"):
+            return int(pid_file.read_text(encoding="utf-8"))
+        await asyncio.sleep(0.01)
+    raise AssertionError("fake java never started")
+
+
+async def test_pharmcat_subprocess_report_is_parsed(tmp_dir):
+    runner = _fake_java(
+        tmp_dir,
+        "open(os.path.join(out, 'report.json'), 'w').write("
+        "'{\"gene_calls\": [{\"gene\": \"cyp2d6\", \"phenotype\": \"Poor Metabolizer\", \"activity_score\": \"0\"}]}')",
+    )
+    calls = await runner.arun_from_vcf(_write_vcf(tmp_dir, _data_line("GENE=CYP2C19")))
+    assert [(call.gene, call.phenotype, call.activity_score) for call in calls] == [("CYP2D6", "Poor Metabolizer", 0.0)]
+    assert calls[0].provenance == {"source": "pharmcat_subprocess", "output_file": "report.json"}
+
+
+async def test_pharmcat_subprocess_failure_falls_back_to_vcf(tmp_dir):
+    runner = _fake_java(
+        tmp_dir,
+        "open(os.path.join(out, 'report.json'), 'w').write('{\"gene_calls\": [{\"gene\": \"CYP2D6\"}]}')\nsys.exit(3)",
+    )
+    calls = await runner.arun_from_vcf(_write_vcf(tmp_dir, _data_line("GENE=CYP2C19")))
+    assert [(call.gene, call.reason_code) for call in calls] == [("CYP2C19", "gene_not_called")]
+
+
+async def test_pharmcat_subprocess_is_killed_on_timeout(tmp_dir):
+    pid_file = Path(tmp_dir) / "java.pid"
+    runner = _fake_java(tmp_dir, f"open({str(pid_file)!r}, 'w').write(str(os.getpid()))\ntime.sleep(60)")
+    runner.timeout_seconds = 0.5
+    calls = await runner.arun_from_vcf(_write_vcf(tmp_dir, _data_line("GENE=CYP2C19")))
+    assert [call.gene for call in calls] == ["CYP2C19"]
+    assert _process_gone(int(pid_file.read_text(encoding="utf-8")))
+
+
+async def test_pharmcat_subprocess_is_killed_when_request_is_cancelled(tmp_dir):
+    pid_file = Path(tmp_dir) / "java.pid"
+    runner = _fake_java(tmp_dir, f"open({str(pid_file)!r}, 'w').write(str(os.getpid()))\ntime.sleep(60)")
+    task = asyncio.create_task(runner.arun_from_vcf(_write_vcf(tmp_dir, _data_line("GENE=CYP2C19"))))
+    pid = await _wait_for_pid(pid_file)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert _process_gone(pid)
@@ -1,3 +1,5 @@
+import pytest
+
 from pathmind_api.scoring import (
     assay_spread,
     confidence_reasons,
@@ -14,23 +16,36 @@ def test_pathway_score_formula_coverage_weighted():
     assert score == 0.14
 
 
-def test_assay_filter_rules():
-    good = {
-        "standard_relation": "=",
-        "assay_type": "B",
-        "assay_organism": "Homo sapiens",
-        "data_validity_comment": None,
-        "pchembl_value": 6.2,
-    }
-    bad = {**good, "standard_relation": ">"}
-    assert meets_assay_filters(good) is True
-    assert meets_assay_filters(bad) is False
+_GOOD_ASSAY = {
+    "standard_relation": "=",
+    "assay_type": "B",
+    "assay_organism": "Homo sapiens",
+    "data_validity_comment": None,
+    "pchembl_value": 6.2,
+}
+
 
+@pytest.mark.parametrize(
+    ("activity", "expected"),
+    [
+        (_GOOD_ASSAY, True),
+        ({**_GOOD_ASSAY, "standard_relation": ">"}, False),
+    ],
+)
+def test_assay_filter_rules(activity, expected):
+    assert meets_assay_filters(activity) is expected
 
-def test_confidence_tier_classification():
-    assert confidence_tier(5, 6.2, 9) == "high"
-    assert confidence_tier(2, 5.1, 8) == "medium"
-    assert confidence_tier(1, 4.9, 7) == "low"
+
+@pytest.mark.parametrize(
+    ("assay_count", "median_pchembl", "confidence_score", "expected"),
+    [
+        (5, 6.2, 9, "high"),
+        (2, 5.1, 8, "medium"),
+        (1, 4.9, 7, "low"),
+    ],
+)
+def test_confidence_tier_classification(assay_count, median_pchembl, confidence_score, expected):
+    assert confidence_tier(assay_count, median_pchembl, confidence_score) == expected
 
 
 def test_assay_spread_iqr():
@@ -41,11 +56,9 @@ def test_assay_spread_iqr():
     assert spread["iqr"] > 0
 
 
-def test_confidence_reasons_content():
-    reasons = confidence_reasons(5, 6.1, 9)
-    assert "assay_count>=5" in reasons
-    assert "median_pchembl>=6.0" in reasons
-    assert "target_confidence>=9" in reasons
+@pytest.mark.parametrize("reason", ["assay_count>=5", "median_pchembl>=6.0", "target_confidence>=9"])
+def test_confidence_reasons_content(reason):
+    assert reason in confidence_reasons(5, 6.1, 9)
 
 
 def test_hierarchy_exclusion_child_over_parent():